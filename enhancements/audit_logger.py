@@ -2,29 +2,253 @@
 """Comprehensive audit logging for all system operations"""
 
 import json
+import logging
 import os
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-from threading import Lock
+import queue
+import struct
+import time
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, Optional, List, Set
+from threading import Event, Lock, Thread, current_thread
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class _DuplicateFilter(logging.Filter):
+    """Drop a record if the same message was emitted within ``interval`` seconds"""
+
+    def __init__(self, interval: float = 1.0):
+        super().__init__()
+        self.interval = interval
+        self._last_msg = None
+        self._last_time = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        msg = record.getMessage()
+        now = time.monotonic()
+        if msg == self._last_msg and now - self._last_time < self.interval:
+            return False
+        self._last_msg = msg
+        self._last_time = now
+        return True
+
+
+_log = logging.getLogger("audit")
+_log.addFilter(_DuplicateFilter())
+
+# Log directories already created by this process
+_ensured_dirs: Set[str] = set()
+
+# Queue marker that tells the writer thread to exit
+_STOP = object()
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize UTC datetimes the same way orjson does"""
+    if isinstance(obj, datetime):
+        if obj.tzinfo is not None:
+            obj = obj.astimezone(timezone.utc).replace(tzinfo=None)
+        return obj.isoformat() + "Z"
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # OPT_NON_STR_KEYS matches json.dumps, which coerces int/float/bool keys
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def _dumps_line(entry: Dict[str, Any]) -> bytes:
+        return orjson.dumps(entry, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+    def _dumps(entry: Dict[str, Any]) -> bytes:
+        return orjson.dumps(entry, option=_ORJSON_OPTIONS)
+
+    _loads = orjson.loads
+else:
+    def _dumps_line(entry: Dict[str, Any]) -> bytes:
+        return (json.dumps(entry, default=_json_default) + '\n').encode('utf-8')
+
+    def _dumps(entry: Dict[str, Any]) -> bytes:
+        return json.dumps(entry, default=_json_default).encode('utf-8')
+
+    _loads = json.loads
+
+
+# Header of framed log files. JSON-lines files never start with a NUL byte,
+# so the first byte tells the two formats apart.
+_FRAMED_MAGIC = b"\x00AUDITLOG-FRAMED-1\n"
+_FRAME_LENGTH = struct.Struct('<I')
+
+
+def _frame(entry: Dict[str, Any]) -> bytes:
+    """Encode an entry as payload followed by its little-endian u32 length"""
+    payload = _dumps(entry)
+    return payload + _FRAME_LENGTH.pack(len(payload))
+
+
+def _is_framed_file(log_file: str) -> bool:
+    """Sniff the log file header to detect the framed format"""
+    with open(log_file, 'rb') as f:
+        return f.read(len(_FRAMED_MAGIC)) == _FRAMED_MAGIC
+
+
+class _LogWriter:
+    """Background thread that appends queued entries to one log file"""
+
+    def __init__(self, log_file: str, framed: bool, flush_interval: float, max_batch: int):
+        self.log_file = log_file
+        self.framed = framed
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        # Coordinates the writer thread with close/clear_logs
+        self.lock = Lock()
+        self.queue: "queue.Queue[Any]" = queue.Queue()
+        self.fd: Optional[int] = None
+        self._fd_framed = False
+        # The thread references only the writer, so an unclosed AuditLogger
+        # can still be collected and stop it from its finalizer
+        self._thread = Thread(target=self._run, name="AuditLoggerFlush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write pending entries, stop the thread and release the log file"""
+        self.queue.put(_STOP)
+        if current_thread() is not self._thread:
+            self._thread.join()
+
+    def close_fd(self):
+        """Close the log fd so the next batch reopens the file"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _run(self):
+        """Drain the queue into the log file in batches"""
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Anything but an entry dict is a marker that ends the batch: a
+            # flush Event (set once the batch is written) or _STOP, which
+            # also ends the thread
+            while isinstance(batch[-1], dict) and len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            marker = None if isinstance(batch[-1], dict) else batch.pop()
+            if batch:
+                self._write_batch(batch)
+            if marker is _STOP:
+                with self.lock:
+                    self.close_fd()
+                return
+            if marker is not None:
+                marker.set()
+
+    def _write_batch(self, entries: List[Dict[str, Any]]):
+        """Write a batch of entries with a single write call"""
+        with self.lock:
+            try:
+                if self.fd is None:
+                    self._open_for_append()
+                encode = _frame if self._fd_framed else _dumps_line
+                # Encode entries one by one so a bad entry costs only itself
+                chunks = []
+                for entry in entries:
+                    try:
+                        chunks.append(encode(entry))
+                    except (TypeError, ValueError) as e:
+                        _log.warning("Skipping unserializable audit entry: %s", e)
+                if not chunks:
+                    return
+                self._write_locked(b''.join(chunks))
+            except Exception as e:
+                _log.warning("Failed to write audit log: %s", e)
+
+    def _open_for_append(self):
+        """Open the log file, keeping the format of an existing file"""
+        self.fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        # Locked so two processes creating the file agree on one header
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size == 0:
+                self._fd_framed = self.framed
+                if self.framed:
+                    self._write_all(_FRAMED_MAGIC)
+            else:
+                self._fd_framed = _is_framed_file(self.log_file)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _write_locked(self, data: bytes):
+        """Append data while holding an exclusive flock on the log file"""
+        if fcntl is None:
+            self._write_all(data)
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            self._write_all(data)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _write_all(self, data: bytes):
+        """Write data to the log fd, retrying on short writes"""
+        view = memoryview(data)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+
 
 class AuditLogger:
     """Thread-safe audit logger for tracking system operations"""
 
-    def __init__(self, log_file: str = "/home/shayne/agent-zero/logs/audit.log"):
+    # Above this many entries get_recent_logs streams the file instead of
+    # buffering the tail in memory
+    STREAM_READ_THRESHOLD = 10000
+
+    def __init__(self, log_file: str = "/home/shayne/agent-zero/logs/audit.log",
+                 flush_interval: float = 1.0, max_batch: int = 256, framed: bool = False):
         self.log_file = log_file
-        self.lock = Lock()
+        self.framed = framed
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
         self._ensure_log_directory()
 
+        self._writer = _LogWriter(log_file, framed, flush_interval, max_batch)
+        self.lock = self._writer.lock
+        self._closed = False
+        # Guards _closed against concurrent enqueues so nothing lands
+        # behind the stop marker
+        self._state_lock = Lock()
+        # Stops the writer on close(), when the logger is collected, or at exit
+        self._finalizer = weakref.finalize(self, self._writer.stop)
+
     def _ensure_log_directory(self):
         """Ensure the log directory exists"""
         log_dir = os.path.dirname(self.log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-
+        if not log_dir or log_dir in _ensured_dirs:
+            return
+        os.makedirs(log_dir, exist_ok=True)
+        _ensured_dirs.add(log_dir)
     def log_command(self, command: str, user: str = "default", status: str = "success", metadata: Optional[Dict] = None):
         """Log a command execution"""
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "command": command,
             "user": user,
             "status": status,
@@ -35,7 +259,7 @@ class AuditLogger:
     def log_error(self, error: str, context: Optional[Dict] = None):
         """Log an error event"""
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "type": "error",
             "error": error,
             "context": context or {}
@@ -45,7 +269,7 @@ class AuditLogger:
     def log_security_event(self, event_type: str, details: Dict[str, Any]):
         """Log a security-related event"""
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "type": "security",
             "event_type": event_type,
             "details": details
@@ -53,36 +277,107 @@ class AuditLogger:
         self._write_entry(entry)
 
     def _write_entry(self, entry: Dict[str, Any]):
-        """Thread-safe write to log file"""
-        with self.lock:
-            try:
-                with open(self.log_file, 'a') as f:
-                    f.write(json.dumps(entry) + '\n')
-            except Exception as e:
-                print(f"Failed to write audit log: {e}")
+        """Queue an entry for the background writer"""
+        with self._state_lock:
+            if not self._closed:
+                self._writer.queue.put(entry)
+                return
+        _log.warning("Audit logger for %s is closed; entry dropped", self.log_file)
+
+    def flush(self):
+        """Block until every entry queued before this call has been written"""
+        written = Event()
+        with self._state_lock:
+            if self._closed:
+                return
+            self._writer.queue.put(written)
+        written.wait()
+
+    def close(self):
+        """Write pending entries, stop the writer thread and release the log file"""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._finalizer()
 
     def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve recent log entries"""
+        self.flush()
         if not os.path.exists(self.log_file):
             return []
 
-        logs = []
+        if limit <= 0:
+            return []
+
+        logs = deque(maxlen=limit)
         try:
-            with open(self.log_file, 'r') as f:
-                for line in f:
-                    try:
-                        logs.append(json.loads(line.strip()))
-                    except json.JSONDecodeError:
-                        continue
+            if _is_framed_file(self.log_file):
+                records = self._read_tail_frames(limit)
+            elif limit > self.STREAM_READ_THRESHOLD:
+                # Large tails are streamed forward so memory stays O(limit)
+                records = self._iter_lines()
+            else:
+                records = self._read_tail_lines(limit)
+
+            for line in records:
+                try:
+                    logs.append(_loads(line))
+                except json.JSONDecodeError:
+                    continue
         except Exception as e:
-            print(f"Failed to read audit log: {e}")
+            _log.warning("Failed to read audit log: %s", e)
+
+        return list(logs)
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        """Yield non-empty lines from the start of the log file"""
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
 
-        return logs[-limit:]
+    def _read_tail_lines(self, limit: int, block_size: int = 65536) -> List[bytes]:
+        """Read the last ``limit`` non-empty lines by scanning backwards from EOF"""
+        with open(self.log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b''
+            # One extra newline guarantees the oldest kept line is complete
+            while pos > 0 and data.count(b'\n') <= limit:
+                read = min(block_size, pos)
+                pos -= read
+                f.seek(pos)
+                data = f.read(read) + data
+
+        lines = [line for line in data.splitlines() if line.strip()]
+        return lines[-limit:]
+
+    def _read_tail_frames(self, limit: int) -> List[bytes]:
+        """Read the last ``limit`` records of a framed log by walking back from EOF"""
+        records = []
+        with open(self.log_file, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            start = len(_FRAMED_MAGIC) + _FRAME_LENGTH.size
+            while pos >= start and len(records) < limit:
+                f.seek(pos - _FRAME_LENGTH.size)
+                (length,) = _FRAME_LENGTH.unpack(f.read(_FRAME_LENGTH.size))
+                pos -= _FRAME_LENGTH.size + length
+                if pos < len(_FRAMED_MAGIC):
+                    break  # Truncated or corrupt record
+                f.seek(pos)
+                records.append(f.read(length))
+
+        records.reverse()
+        return records
 
     def clear_logs(self):
         """Clear the audit log"""
-        if os.path.exists(self.log_file):
-            os.remove(self.log_file)
+        self.flush()
+        with self.lock:
+            self._writer.close_fd()
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
 
 if __name__ == "__main__":
     logger = AuditLogger("/tmp/test_audit.log")
@@ -14,6 +14,7 @@ import sys
 import os
 import json
 import logging
+import re
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
@@ -22,6 +23,21 @@ sys.path.append('/home/shayne/agent-zero/instruments')
 from memory_interface import remember, recall, connect, learn
 
 
+# Compiled once at import; these run on every analyzed conversation turn
+_QUESTION_RE = re.compile(r'\?|\b(?:what|how|why|when|where|who|can you|could you)\b', re.IGNORECASE)
+
+# Context keys that can contribute something worth saving
+_CONTENT_KEYS = ('user_message', 'ai_response', 'new_discoveries', 'decisions_made', 'tools_used')
+
+# Patterns that indicate important information in an AI response
+_KEY_INFO_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(?:The|This|A) (?:command|tool|feature|system|module) (?:is|provides|supports)\s+[^.]+\.',
+    r'(?:Located|Found|Stored) (?:at|in)\s+[^.]+\.',
+    r'(?:To|For) (?:use|install|configure|run)\s+[^.]+\.',
+    r'Important\s*:?+[^.]+\.',
+))
+
+
 class AutoMemory:
     """Automatic memory management for Agent Zero."""
 
@@ -32,13 +48,14 @@ class AutoMemory:
     def _setup_logger(self) -> logging.Logger:
         """Setup logger for auto memory."""
         logger = logging.getLogger('AutoMemory')
-        logger.setLevel(logging.INFO)
+        if logger.handlers:
+            return logger
         
-        if not logger.handlers:
-            handler = logging.StreamHandler(sys.stderr)
-            formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler(sys.stderr)
+        formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
         
         return logger
     
@@ -64,6 +81,12 @@ class AutoMemory:
             'total_saved': 0
         }
         
+        # Nothing to analyze (e.g. system-generated turns)
+        if not context.get('task_completed') and not any(
+            context.get(key) for key in _CONTENT_KEYS
+        ):
+            return results
+        
         try:
             # Extract information from context
             user_message = context.get('user_message', '')
@@ -155,27 +178,21 @@ class AutoMemory:
     
     def _is_question(self, text: str) -> bool:
         """Check if text is a question."""
-        question_indicators = ['?', 'what', 'how', 'why', 'when', 'where', 'who', 'can you', 'could you']
-        text_lower = text.lower()
-        return any(indicator in text_lower for indicator in question_indicators)
+        return _QUESTION_RE.search(text) is not None
     
     def _extract_task_summary(self, context: Dict[str, Any]) -> Optional[str]:
         """Extract task summary from context."""
         user_message = context.get('user_message', '')
         ai_response = context.get('ai_response', '')
         
-        # Look for task completion indicators
-        completion_indicators = ['completed', 'finished', 'done', 'success', 'created', 'deleted', 'updated']
-        
         summary_parts = []
         if user_message:
             summary_parts.append(f"Task: {user_message[:150]}")
         
         if ai_response:
-            # Extract first meaningful sentence from response
-            sentences = ai_response.split('.')
-            if sentences:
-                summary_parts.append(f"Result: {sentences[0][:200]}")
+            # Extract first sentence without splitting the whole response
+            first_sentence = ai_response.partition('.')[0]
+            summary_parts.append(f"Result: {first_sentence[:200]}")
         
         return ' | '.join(summary_parts) if summary_parts else None
     
@@ -183,17 +200,8 @@ class AutoMemory:
         """Extract key information from text."""
         key_info = []
         
-        # Look for patterns that indicate important information
-        patterns = [
-            r'(?:The|This|A) (?:command|tool|feature|system|module) (?:is|provides|supports)\s+[^.]+\.',
-            r'(?:Located|Found|Stored) (?:at|in)\s+[^.]+\.',
-            r'(?:To|For) (?:use|install|configure|run)\s+[^.]+\.',
-            r'Important\s*:?+[^.]+\.',
-        ]
-        
-        import re
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _KEY_INFO_PATTERNS:
+            matches = pattern.findall(text)
             key_info.extend(matches[:2])  # Limit to 2 matches per pattern
         
         return key_info[:5]  # Limit total key information
@@ -219,6 +227,18 @@ class AutoMemory:
             return False
 
 
+# Shared instance for the convenience functions below
+_auto_memory: Optional[AutoMemory] = None
+
+
+def _get_auto_memory() -> AutoMemory:
+    """Return the shared AutoMemory instance, creating it on first use."""
+    global _auto_memory
+    if _auto_memory is None:
+        _auto_memory = AutoMemory()
+    return _auto_memory
+
+
 # Convenience functions for quick usage
 def save_after_conversation(user_message: str, ai_response: str, 
                            tools_used: List[str] = None,
@@ -234,7 +254,7 @@ def save_after_conversation(user_message: str, ai_response: str,
     Returns:
         Dictionary with save results
     """
-    auto_memory = AutoMemory()
+    auto_memory = _get_auto_memory()
     context = {
         'user_message': user_message,
         'ai_response': ai_response,
@@ -3,80 +3,149 @@
 """In-memory cache for command definitions"""
 
 import json
+import logging
+import os
 import time
 import threading
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Any, Tuple
 from pathlib import Path
 
+
+_log = logging.getLogger("command_cache")
+
+def _freeze(obj: Any) -> Any:
+    """Recursively convert dicts/lists into read-only mappings/tuples"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
 class CommandCache:
-    """Thread-safe in-memory cache for command definitions"""
+    """Thread-safe in-memory cache for command definitions
 
-    def __init__(self, cache_ttl: int = 300):  # 5 minutes TTL
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.timestamps: Dict[str, float] = {}
+    Cached definitions are frozen (read-only mappings and tuples) so they can
+    be handed to callers directly without copying. Unknown command names are
+    remembered for ``miss_ttl`` seconds so repeated lookups skip the disk.
+    Definitions live in an LRU map of ``name -> (value, expires_at)`` bounded
+    by ``max_size``; misses are kept in a separate LRU map bounded by
+    ``max_misses`` so probing unknown names never evicts a definition.
+    """
+
+    def __init__(self, cache_ttl: int = 300,  # 5 minutes TTL
+                 miss_ttl: int = 30, max_size: int = 1024, max_misses: int = 256,
+                 commands_dir: str = "/home/shayne/agent-zero/commands"):
+        self._cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._misses: "OrderedDict[str, float]" = OrderedDict()
         self.lock = threading.Lock()
         self.cache_ttl = cache_ttl
-        self.commands_dir = Path("/home/shayne/agent-zero/commands")
+        self._miss_ttl = miss_ttl
+        self.max_size = max_size
+        self.max_misses = max_misses
+        self.commands_dir = Path(commands_dir)
 
-    def get(self, command_name: str) -> Optional[Dict[str, Any]]:
+    def get(self, command_name: str) -> Optional[Mapping[str, Any]]:
         """Get command from cache, load from disk if not cached or expired"""
         with self.lock:
-            # Check if cache is valid
-            if (command_name in self.cache and 
-                command_name in self.timestamps and
-                time.time() - self.timestamps[command_name] < self.cache_ttl):
-                return self.cache[command_name].copy()
+            now = time.monotonic()
+            entry = self._cache.get(command_name)
+            if entry is not None:
+                cmd_def, expires_at = entry
+                if now < expires_at:
+                    self._cache.move_to_end(command_name)
+                    return cmd_def
+                del self._cache[command_name]
+            expires_at = self._misses.get(command_name)
+            if expires_at is not None:
+                if now < expires_at:
+                    self._misses.move_to_end(command_name)
+                    return None
+                del self._misses[command_name]
 
         # Load from disk
         return self._load_from_disk(command_name)
 
-    def _load_from_disk(self, command_name: str) -> Optional[Dict[str, Any]]:
+    def _store(self, command_name: str, cmd_def: Mapping[str, Any]):
+        """Insert a definition, evicting the least recently used one when full"""
+        with self.lock:
+            self._misses.pop(command_name, None)
+            self._cache[command_name] = (cmd_def, time.monotonic() + self.cache_ttl)
+            self._cache.move_to_end(command_name)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def _store_miss(self, command_name: str):
+        """Remember that a command has no definition, evicting the oldest miss when full"""
+        with self.lock:
+            self._misses[command_name] = time.monotonic() + self._miss_ttl
+            self._misses.move_to_end(command_name)
+            while len(self._misses) > self.max_misses:
+                self._misses.popitem(last=False)
+
+    def _load_from_disk(self, command_name: str) -> Optional[Mapping[str, Any]]:
         """Load command definition from disk"""
         command_file = self.commands_dir / f"{command_name}.json"
 
         if not command_file.exists():
+            self._store_miss(command_name)
             return None
 
         try:
             with open(command_file, 'r') as f:
                 cmd_def = json.load(f)
 
+            # Derived fields computed once; executions reuse them verbatim
+            cmd_def["_workflow_rendered"] = "".join(
+                f"{i}. {step}\n" for i, step in enumerate(cmd_def.get("workflow", []), 1)
+            )
+            cmd_def["_idempotent"] = bool(cmd_def.get("idempotent", False))
+            cmd_def = _freeze(cmd_def)
+
             # Update cache
-            with self.lock:
-                self.cache[command_name] = cmd_def
-                self.timestamps[command_name] = time.time()
+            self._store(command_name, cmd_def)
 
-            return cmd_def.copy()
+            return cmd_def
         except Exception as e:
+            _log.debug("Failed to load command %s: %s", command_name, e)
             return None
 
     def refresh(self, command_name: str = None):
         """Refresh cache for specific command or all commands"""
-        if command_name:
-            with self.lock:
-                if command_name in self.timestamps:
-                    del self.timestamps[command_name]
-                if command_name in self.cache:
-                    del self.cache[command_name]
-        else:
-            with self.lock:
-                self.cache.clear()
-                self.timestamps.clear()
+        with self.lock:
+            if command_name:
+                self._cache.pop(command_name, None)
+                self._misses.pop(command_name, None)
+            else:
+                self._cache.clear()
+                self._misses.clear()
 
     def preload(self):
         """Preload all commands into cache"""
-        if not self.commands_dir.exists():
+        try:
+            with os.scandir(self.commands_dir) as entries:
+                command_names = [entry.name[:-5] for entry in entries
+                                 if entry.name.endswith(".json") and entry.is_file()]
+        except FileNotFoundError:
+            return
+
+        if not command_names:
             return
 
-        for command_file in self.commands_dir.glob("*.json"):
-            command_name = command_file.stem
-            self.get(command_name)
+        # Overlap the per-file open/read latency; cache updates are lock-guarded
+        max_workers = min(16, (os.cpu_count() or 1) * 2, len(command_names))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.get, command_names))
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         with self.lock:
+            commands = list(self._cache)
             return {
-                "cached_commands": len(self.cache),
+                "cached_commands": len(commands),
                 "cache_ttl": self.cache_ttl,
-                "commands": list(self.cache.keys())
+                "commands": commands
             }
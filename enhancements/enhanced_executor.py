@@ -2,7 +2,6 @@
 """Enhanced command executor with security, performance, and monitoring"""
 
 import os
-import json
 import time
 import re
 from datetime import datetime
@@ -29,7 +28,7 @@ class EnhancedCommandExecutor:
         self.error_sanitizer = ErrorSanitizer()
         self.rate_limiter = CommandRateLimiter()
         self.audit_logger = AuditLogger()
-        self.command_cache = CommandCache()
+        self.command_cache = CommandCache(commands_dir=commands_dir)
         self.metrics = MetricsCollector()
         self.alert_system = AlertSystem()
 
@@ -60,49 +59,36 @@ class EnhancedCommandExecutor:
         specialist = "default"
         
         try:
-            # Check rate limit
-            allowed, reason = self.rate_limiter.is_command_allowed(command_name, user)
-            if not allowed:
-                error_msg = self.error_sanitizer.sanitize_error(
-                    f"Rate limit exceeded for command: {command_name}. Reason: {reason}"
-                )
-                self.metrics.record_command_end(command_name, user, False, error_msg)
-                return False, error_msg
-            
-            # Check cache first (Note: current cache implementation only supports command_name)
-            # Context-aware caching would require extending CommandCache
-            cached_result = self.command_cache.get(command_name)
-            if cached_result is not None:
-                self.metrics.record_command_end(command_name, user, True)
-                return True, json.dumps(cached_result)
+            # Command definitions are loaded (and cached) by the command cache
+            cmd_def = self.command_cache.get(command_name)
+
+            # Idempotent commands are read-only lookups and bypass the rate limiter
+            if cmd_def is None or not cmd_def["_idempotent"]:
+                allowed, reason = self.rate_limiter.is_command_allowed(command_name, user)
+                if not allowed:
+                    error_msg = self.error_sanitizer.sanitize_error(
+                        f"Rate limit exceeded for command: {command_name}. Reason: {reason}"
+                    )
+                    self.metrics.record_command_end(command_name, user, False, error_msg)
+                    return False, error_msg
             
-            # Load command definition
-            cmd_file = os.path.join(self.commands_dir, f"{command_name}.json")
-            if not os.path.exists(cmd_file):
+            if cmd_def is None:
                 error_msg = self.error_sanitizer.sanitize_error(
                     f"Command definition not found: {command_name}"
                 )
                 self.metrics.record_command_end(command_name, user, False, error_msg)
                 return False, error_msg
             
-            with open(cmd_file, 'r') as f:
-                cmd_def = json.load(f)
-            
             # Record command start
             specialist = cmd_def.get("specialist_role", "default")
             self.metrics.record_command_start(command_name, user, specialist)
 
             # Simulate command execution
             # In a real implementation, this would delegate to the specialist agent
-            workflow = cmd_def.get("workflow", [])
-
-            result = f"Command executed by {specialist} specialist.\n"
-            result += f"Workflow steps:\n"
-            for i, step in enumerate(workflow, 1):
-                result += f"{i}. {step}\n"
-            
-            # Note: Caching result is skipped as CommandCache doesn't support setting arbitrary results
-            # The cache only preloads command definitions from disk
+            result = (
+                f"Command executed by {specialist} specialist.\n"
+                f"Workflow steps:\n{cmd_def['_workflow_rendered']}"
+            )
             
             # Record metrics
             execution_time = time.time() - start_time
@@ -140,8 +126,13 @@ class EnhancedCommandExecutor:
             "cache_stats": self.command_cache.get_stats()
         }
 
+    def close(self):
+        """Flush the audit log and stop its writer thread"""
+        self.audit_logger.close()
+
 if __name__ == "__main__":
     executor = EnhancedCommandExecutor()
     success, result = executor.execute_command("security_audit")
     print(f"Success: {success}")
     print(f"Result: {result}")
+    executor.close()
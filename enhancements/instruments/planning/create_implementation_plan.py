@@ -15,22 +15,27 @@ Author: Agent Zero Framework
 Created: 2025-01-15
 """
 
-import argparse
+import functools
 import re
+import string
 import sys
-from datetime import datetime
+from datetime import date
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, ClassVar, Dict, List, Optional, Set
 
 # Constants
 PROJECT_ROOT = Path("/home/shayne/agent-zero/usr/projects/agent_zero_enhancements_and_extensions")
 PLANS_DIR = PROJECT_ROOT / "plans"
 TEMPLATES_DIR = PROJECT_ROOT / "templates"
 
+# Slugify patterns
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
 # Plan templates
 PLAN_TEMPLATES = {
     "feature": '''
-# [FEATURE_NAME] Implementation Plan
+# {title} Implementation Plan
 
 > **Status:** DRAFT
 > **Type:** Feature
@@ -107,7 +112,7 @@ ls -la package.json || ls -la requirements.txt
 ''',
 
     "bugfix": '''
-# [BUGFIX_NAME] Bug Fix Plan
+# {title} Bug Fix Plan
 
 > **Status:** DRAFT
 > **Type:** Bugfix
@@ -186,7 +191,7 @@ git log --oneline -10
 ''',
 
     "refactor": '''
-# [REFACTOR_NAME] Refactoring Plan
+# {title} Refactoring Plan
 
 > **Status:** DRAFT
 > **Type:** Refactor
@@ -268,10 +273,83 @@ npm test || pytest --cov
 '''
 }
 
+# Normalize template literals once at import so renders need no cleanup
+PLAN_TEMPLATES = {plan_type: template.lstrip('\n')
+                  for plan_type, template in PLAN_TEMPLATES.items()}
+
+_TEMPLATE_KEYS = tuple(PLAN_TEMPLATES)
+_TEMPLATE_KEYSET = frozenset(PLAN_TEMPLATES)
+_VALID_TYPES_MSG = repr(list(PLAN_TEMPLATES))
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    Parse a str.format template once into literal and field pieces.
+
+    Only plain ``{field}`` replacements are supported; the returned callable
+    renders the template by joining the literals with the field values.
+    """
+    parts: List[str] = []
+    fields = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        parts.append(literal)
+        if field_name is not None:
+            if format_spec or conversion:
+                raise ValueError(f"Unsupported template field: {{{field_name}}}")
+            fields.append((len(parts), field_name))
+            parts.append("")
+
+    def render(**values: str) -> str:
+        out = parts.copy()
+        for index, field_name in fields:
+            out[index] = str(values[field_name])
+        return "".join(out)
+
+    return render
+
+
+_RENDERERS = {plan_type: _compile_template(template)
+              for plan_type, template in PLAN_TEMPLATES.items()}
+
+
+@functools.lru_cache(maxsize=4)
+def _today_str(ordinal: int) -> str:
+    """Format a day ordinal as YYYY-MM-DD; keyed by ordinal so it rolls over at midnight."""
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=128)
+def _render_plan(plan_type: str, date: str, goal: str, title: str) -> str:
+    """Render a plan template; memoized since inputs often repeat in batch runs."""
+    return _RENDERERS[plan_type](
+        title=title,
+        date=date,
+        goal=goal
+    )
+
+
+def _format_task(index: int, name: str, context: str, verify: str,
+                 steps_block: str) -> str:
+    """Render one task section for add_task_group."""
+    return f"""### Task {index}: {name}
+
+**Context:** `{context}`
+
+**Steps:**
+{steps_block}
+**Verify:** `{verify}`
+
+---
+
+"""
+
 
 class PlanGenerator:
     """Generates implementation plans from templates."""
 
+    # Output directories already created by this process
+    _ensured_dirs: ClassVar[Set[Path]] = set()
+
     def __init__(self, plan_type: str, name: str, goal: str,
                  output_dir: Optional[Path] = None):
         """
@@ -287,40 +365,31 @@ class PlanGenerator:
         self.name = name
         self.goal = goal
         self.output_dir = output_dir or PLANS_DIR
-        self.date = datetime.now().strftime("%Y-%m-%d")
+        self.date = _today_str(date.today().toordinal())
 
-        if self.plan_type not in PLAN_TEMPLATES:
+        if self.plan_type not in _TEMPLATE_KEYSET:
             raise ValueError(
                 f"Invalid plan type: {plan_type}. "
-                f"Must be one of: {list(PLAN_TEMPLATES.keys())}"
+                f"Must be one of: {_VALID_TYPES_MSG}"
             )
 
+        self._filename = f"{self.date}-{self.slugify(self.name)}.md"
+        self._title = self.name.replace("-", " ").title()
+
     def slugify(self, text: str) -> str:
         """Convert text to URL-friendly slug."""
         slug = text.lower().strip()
-        slug = re.sub(r'[^\w\s-]', '', slug)
-        slug = re.sub(r'[-\s]+', '-', slug)
+        slug = _SLUG_STRIP.sub('', slug)
+        slug = _SLUG_DASH.sub('-', slug)
         return slug
 
     def generate_filename(self) -> str:
         """Generate plan filename with date-based naming."""
-        slug_name = self.slugify(self.name)
-        return f"{self.date}-{slug_name}.md"
+        return self._filename
 
     def generate_content(self) -> str:
         """Generate plan content from template."""
-        template = PLAN_TEMPLATES[self.plan_type]
-        content = template.format(
-            date=self.date,
-            goal=self.goal
-        )
-
-        feature_name_title = self.name.replace("-", " ").title()
-        content = content.replace("[FEATURE_NAME]", feature_name_title)
-        content = content.replace("[BUGFIX_NAME]", feature_name_title)
-        content = content.replace("[REFACTOR_NAME]", feature_name_title)
-
-        return content
+        return _render_plan(self.plan_type, self.date, self.goal, self._title)
 
     def save_plan(self) -> Path:
         """
@@ -329,14 +398,15 @@ class PlanGenerator:
         Returns:
             Path to the saved plan file
         """
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.output_dir not in self._ensured_dirs:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(self.output_dir)
 
         filename = self.generate_filename()
         content = self.generate_content()
 
         plan_path = self.output_dir / filename
-        with open(plan_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        plan_path.write_text(content, encoding='utf-8')
 
         return plan_path
 
@@ -353,57 +423,41 @@ class PlanGenerator:
         if not plan_path.exists():
             raise FileNotFoundError(f"Plan not found: {plan_path}")
 
-        with open(plan_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = plan_path.read_text(encoding='utf-8')
 
-        group_section = f"\n## {group_name}\n\n"
+        parts = [f"\n## {group_name}\n\n"]
         for i, task in enumerate(tasks, 1):
-            task_name = task.get('name', f'Task {i}')
-            task_context = task.get('context', '')
-            task_verify = task.get('verify', '')
-            task_steps = task.get('steps', [])
-
-            task_section = f"""### Task {i}: {task_name}
-
-**Context:** `{task_context}`
-
-**Steps:**
-"""
-            for step in task_steps:
-                task_section += f"1. [ ] {step}\n"
-
-            task_section += f"""
-**Verify:** `{task_verify}`
-
----
-
-"""
-            group_section += task_section
+            name, context, verify, steps = (
+                task.get('name', f'Task {i}'),
+                task.get('context', ''),
+                task.get('verify', ''),
+                task.get('steps', []),
+            )
+            steps_block = "".join(f"1. [ ] {step}\n" for step in steps)
+            parts.append(_format_task(i, name, context, verify, steps_block))
+        group_section = "".join(parts)
 
-        if "## Tasks" in content:
-            parts = content.split("## Tasks")
-            content = parts[0] + "## Tasks" + group_section + parts[1]
+        before, marker, after = content.partition("## Tasks")
+        if marker:
+            content = before + marker + group_section + after
         else:
             content += "\n## Tasks\n" + group_section
 
-        with open(plan_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        plan_path.write_text(content, encoding='utf-8')
 
 
 def create_plan_interactive() -> None:
     """Interactive mode for creating plans."""
-    print("\n=== Agent Zero Implementation Plan Generator ===\n")
-
-    print("Available plan types:")
-    for i, ptype in enumerate(PLAN_TEMPLATES.keys(), 1):
-        print(f"  {i}. {ptype}")
+    lines = ["\n=== Agent Zero Implementation Plan Generator ===\n", "Available plan types:"]
+    lines.extend(f"  {i}. {ptype}" for i, ptype in enumerate(_TEMPLATE_KEYS, 1))
+    sys.stdout.write("\n".join(lines) + "\n")
 
     while True:
         choice = input("\nSelect plan type (number or name): ").strip()
-        if choice.isdigit() and 1 <= int(choice) <= len(PLAN_TEMPLATES):
-            plan_type = list(PLAN_TEMPLATES.keys())[int(choice) - 1]
+        if choice.isdigit() and 1 <= int(choice) <= len(_TEMPLATE_KEYS):
+            plan_type = _TEMPLATE_KEYS[int(choice) - 1]
             break
-        elif choice.lower() in PLAN_TEMPLATES:
+        elif choice.lower() in _TEMPLATE_KEYSET:
             plan_type = choice.lower()
             break
         else:
@@ -422,9 +476,12 @@ def create_plan_interactive() -> None:
     try:
         generator = PlanGenerator(plan_type, name, goal)
         plan_path = generator.save_plan()
-        print(f"\n✓ Plan created successfully: {plan_path}")
-        print(f"\nTo edit the plan, open: {plan_path}")
-        print("To execute the plan, run: python execute_implementation_plan.py --plan {plan_path.name}")
+        sys.stdout.write(
+            f"\n✓ Plan created successfully: {plan_path}\n"
+            f"\nTo edit the plan, open: {plan_path}\n"
+            f"To execute the plan, run: python execute_implementation_plan.py --plan {plan_path.name}\n"
+        )
+        sys.stdout.flush()
     except Exception as e:
         print(f"\n✗ Error creating plan: {e}")
         sys.exit(1)
@@ -432,6 +489,8 @@ def create_plan_interactive() -> None:
 
 def main():
     """Main entry point."""
+    import argparse  # CLI-only; keeps library imports light
+
     parser = argparse.ArgumentParser(
         description="Generate Agent Zero implementation plans",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -14,23 +14,78 @@ Author: Agent Zero Framework
 Created: 2025-01-15
 """
 
-import argparse
-import json
+import asyncio
+import functools
+import mmap
 import os
 import re
+import shlex
+import signal
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 # Constants
 PROJECT_ROOT = Path("/home/shayne/agent-zero/usr/projects/agent_zero_enhancements_and_extensions")
 PLANS_DIR = PROJECT_ROOT / "plans"
 
+# Kernel buffer size requested for shell worker output pipes. With 1 MiB
+# instead of the 64 KiB default, commands that emit large build logs block
+# less often and each wakeup of the event loop drains more data.
+_PIPE_BUFFER = 1 << 20
+_F_SETPIPE_SZ = getattr(fcntl, 'F_SETPIPE_SZ', None)
+
+# Only the last 64 KiB of a command's output is kept; failure messages need
+# the tail, and verbose tools can print far more than that
+_OUTPUT_TAIL = 64 * 1024
+
+# Plans larger than this are memory-mapped instead of read into memory
+_MMAP_THRESHOLD = 256 * 1024
+
+# Plan parsing patterns. Plans are parsed as UTF-8 bytes and only the
+# extracted values are decoded.
+_RE_SECTION = re.compile(rb'^## (.+)$', re.MULTILINE)
+_RE_CODE_BASH = re.compile(rb'```bash\n(.*?)```', re.DOTALL)
+# Classifies a line of the Tasks section in one match; the outermost group
+# of each alternative closes last, so match.lastgroup names the line kind
+_RE_TASK_LINE = re.compile(
+    rb'(?P<context>\*\*Context:\*\*)'
+    rb'|(?P<steps>\*\*Steps:\*\*)'
+    rb'|(?P<verify>\*\*Verify:\*\*)'
+    rb'|(?P<depends>\*\*Depends:\*\*(?P<depends_list>.*))'
+    rb'|(?P<task>### Task\s+(?P<task_num>\d+):\s*(?P<task_name>.+))'
+    rb'|(?P<subsystem>##\s+(?P<subsystem_name>.+))'
+    rb'|(?P<heading>##.*)'
+    rb'|(?P<step>\d+\.\s*\[\s*[x ]?\s*\]\s*(?P<step_text>.+))'
+)
+_RE_BACKTICK = re.compile(rb'`([^`]+)`')
+_RE_LIST_ITEM = re.compile(rb'-\s*\[\s*[x ]?\s*\]\s*(.+)')
+_RE_STATUS = re.compile(rb'\*\*Status:\*\*\s*\w+')
+
+
+@functools.lru_cache(maxsize=None)
+def _field_pattern(field: str) -> re.Pattern:
+    """Compiled pattern for a **Field:** value line."""
+    return re.compile(rb'\*\*' + field.encode() + rb':\*\*\s*([^\n\*]+)')
+
+
+@functools.lru_cache(maxsize=None)
+def _list_pattern(field: str) -> re.Pattern:
+    """Compiled pattern for a **Field:** checklist block."""
+    return re.compile(rb'\*\*' + field.encode() + rb':\*\*\s*\n((?:-\s*\[\s*[x ]?\s*\].+\n)+)', re.MULTILINE)
+
 
 class TaskStatus(Enum):
     """Task execution status."""
@@ -41,7 +96,7 @@ class TaskStatus(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Represents a single task in the implementation plan."""
     id: str
@@ -56,7 +111,154 @@ class Task:
     error: Optional[str] = None
 
 
-@dataclass
+class _ShellProtocol(asyncio.SubprocessProtocol):
+    """Collects shell worker output directly from the pipe callbacks."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.SubprocessTransport] = None
+        self.exited = asyncio.get_running_loop().create_future()
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self._markers: Dict[int, bytes] = {}
+        self._done: Optional[asyncio.Future] = None
+
+    def connection_made(self, transport: asyncio.SubprocessTransport) -> None:
+        self.transport = transport
+        if _F_SETPIPE_SZ is None:
+            return
+        for fd in (1, 2):
+            pipe = transport.get_pipe_transport(fd).get_extra_info('pipe')
+            try:
+                fcntl.fcntl(pipe.fileno(), _F_SETPIPE_SZ, _PIPE_BUFFER)
+            except (AttributeError, OSError):
+                pass
+
+    def expect(self, rc_marker: bytes, err_marker: bytes) -> asyncio.Future:
+        """Start collecting a command's output; the future resolves at both markers."""
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self._markers = {1: rc_marker, 2: err_marker}
+        self._done = asyncio.get_running_loop().create_future()
+        return self._done
+
+    def pipe_data_received(self, fd: int, data: bytes) -> None:
+        buf = self.stdout if fd == 1 else self.stderr
+        buf += data
+        # Trim in amortized steps rather than on every chunk
+        if len(buf) > 2 * _OUTPUT_TAIL:
+            del buf[:-_OUTPUT_TAIL]
+        marker = self._markers.get(fd)
+        # The marker is the last thing written, so only the tail is checked
+        if marker is not None and buf.endswith(b"\n") and marker in buf[-len(marker) - 16:]:
+            self._finish(fd)
+
+    def pipe_connection_lost(self, fd: int, exc: Optional[Exception]) -> None:
+        self._finish(fd)
+
+    def process_exited(self) -> None:
+        if not self.exited.done():
+            self.exited.set_result(self.transport.get_returncode())
+
+    def _finish(self, fd: int) -> None:
+        self._markers.pop(fd, None)
+        if not self._markers and self._done is not None and not self._done.done():
+            self._done.set_result(None)
+
+
+class ShellWorker:
+    """
+    Long-lived bash process that runs commands one after another.
+
+    Commands share the shell's cwd and environment, and skip the fork/exec
+    of a fresh /bin/sh per command. After each command the shell prints an
+    end marker carrying the exit code on stdout and a second marker on
+    stderr, so both streams can be read up to the command's boundary. A
+    worker runs one command at a time; use one per task group.
+    """
+
+    def __init__(self):
+        self._protocol: Optional[_ShellProtocol] = None
+        self._token = os.urandom(8).hex()
+        self._count = 0
+
+    async def _spawn(self) -> _ShellProtocol:
+        """Start the shell in its own session so a timeout can kill its children."""
+        loop = asyncio.get_running_loop()
+        _, self._protocol = await loop.subprocess_exec(
+            _ShellProtocol,
+            'bash', '--noprofile', '--norc',
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+        return self._protocol
+
+    async def run(self, cmd: str, timeout: float,
+                  capture_stdout: bool = True) -> Tuple[int, str, str]:
+        """
+        Run a command and return (returncode, stdout, stderr).
+
+        Only the last 64 KiB of each stream is returned. With capture_stdout
+        off the command's stdout goes to /dev/null and '' is returned for it.
+        """
+        protocol = self._protocol
+        if protocol is None or protocol.exited.done():
+            protocol = await self._spawn()
+        self._count += 1
+        rc_marker = f"__RC_{self._token}_{self._count}__".encode()
+        err_marker = f"__ERR_{self._token}_{self._count}__".encode()
+        # Commands must not read the worker's stdin, which carries the script.
+        # eval keeps a syntax error (e.g. an unbalanced quote) inside this
+        # command instead of swallowing the marker lines that follow.
+        redirect = "" if capture_stdout else " >/dev/null"
+        script = (
+            f"{{ eval {shlex.quote(cmd)}\n}} </dev/null{redirect}\n"
+            f"printf '\\n%s %d\\n' {rc_marker.decode()} $?\n"
+            f"printf '\\n%s\\n' {err_marker.decode()} >&2\n"
+        )
+        done = protocol.expect(rc_marker, err_marker)
+        protocol.transport.get_pipe_transport(0).write(script.encode())
+
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+
+        out, err = protocol.stdout, protocol.stderr
+        marker_at = out.rfind(b"\n" + rc_marker + b" ")
+        if marker_at == -1:
+            # The command exited the shell; report the shell's status
+            returncode = await protocol.exited
+            await self.close()
+        else:
+            returncode = int(out[marker_at + len(rc_marker) + 2:].strip())
+            del out[marker_at:]
+        err_at = err.rfind(b"\n" + err_marker + b"\n")
+        if err_at != -1:
+            del err[err_at:]
+        return (
+            returncode,
+            out[-_OUTPUT_TAIL:].decode(errors='replace'),
+            err[-_OUTPUT_TAIL:].decode(errors='replace')
+        )
+
+    async def close(self) -> None:
+        """Terminate the shell and any commands it is still running."""
+        protocol, self._protocol = self._protocol, None
+        if protocol is None:
+            return
+        if not protocol.exited.done():
+            try:
+                os.killpg(protocol.transport.get_pid(), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await protocol.exited
+        protocol.transport.close()
+
+
+@dataclass(slots=True)
 class TaskGroup:
     """Represents a group of tasks that share context."""
     name: str
@@ -64,16 +266,90 @@ class TaskGroup:
     tasks: List[Task] = field(default_factory=list)
     dependencies: List[str] = field(default_factory=list)
     status: TaskStatus = TaskStatus.PENDING
+    shell: Optional[ShellWorker] = field(default=None, repr=False, compare=False)
     
     def add_task(self, task: Task) -> None:
         """Add a task to this group."""
-        task.group = self.name
-        task.subsystem = self.subsystem
+        # Every task of a group shares one copy of the group's strings
+        task.group = sys.intern(self.name)
+        task.subsystem = sys.intern(self.subsystem)
         self.tasks.append(task)
-    
-    def is_ready(self, completed_groups: set) -> bool:
-        """Check if all dependencies are completed."""
-        return all(dep in completed_groups for dep in self.dependencies)
+
+
+def _iter_task_events(content: bytes, start: int, end: int) -> Iterator[tuple]:
+    """
+    Scan the lines of content[start:end] once, yielding parse events.
+
+    Events are ('subsystem', name), ('depends', [names]), ('task', number,
+    name), ('context', text), ('step', text) and ('verify', text);
+    context/verify text is None when the line has no backtick-quoted value.
+    A task ends at its **Verify:** line or at the next heading. Lines are
+    matched in place, so content can be an mmap without being copied.
+    """
+    in_task = False
+    in_steps = False
+    line_end = start - 1
+    while line_end < end:
+        line_start = line_end + 1
+        line_end = content.find(b'\n', line_start, end)
+        if line_end == -1:
+            line_end = end
+        match = _RE_TASK_LINE.match(content, line_start, line_end)
+        kind = match.lastgroup if match else None
+
+        if in_task:
+            if kind == 'verify':
+                backtick = _RE_BACKTICK.search(content, line_start, line_end)
+                yield ('verify', backtick.group(1).decode() if backtick else None)
+                in_task = in_steps = False
+                continue
+            if kind in ('task', 'subsystem', 'heading'):
+                in_task = in_steps = False
+            elif in_steps:
+                if kind == 'step':
+                    yield ('step', match.group('step_text').strip().decode())
+                continue
+            elif kind == 'context':
+                backtick = _RE_BACKTICK.search(content, line_start, line_end)
+                yield ('context', backtick.group(1).decode() if backtick else None)
+                continue
+            elif kind == 'steps':
+                in_steps = True
+                continue
+            else:
+                continue
+
+        if kind == 'subsystem':
+            subsystem_name = match.group('subsystem_name').strip().decode()
+            if subsystem_name != 'Tasks':
+                yield ('subsystem', subsystem_name)
+        elif kind == 'task':
+            yield ('task', match.group('task_num').decode(), match.group('task_name').strip().decode())
+            in_task = True
+        elif kind == 'depends':
+            names = (name.strip().strip(b'`') for name in match.group('depends_list').split(b','))
+            yield ('depends', [name.decode() for name in names if name])
+
+
+def _split_sections(content: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Locate the '## ' sections of a plan in one scan.
+
+    Returns {name: (body_start, body_end)} offsets into content, where the
+    body runs from the line after the heading to the next '## ' heading.
+    The first section with a given name wins.
+    """
+    sections: Dict[str, Tuple[int, int]] = {}
+    name = None
+    body_start = 0
+    for match in _RE_SECTION.finditer(content):
+        if name is not None:
+            sections.setdefault(name, (body_start, match.start()))
+        name = match.group(1).strip().decode()
+        body_start = match.end() + 1
+    if name is not None:
+        sections.setdefault(name, (body_start, len(content)))
+    return sections
 
 
 class PlanParser:
@@ -81,7 +357,9 @@ class PlanParser:
     
     def __init__(self, plan_path: Path):
         self.plan_path = plan_path
-        self.content = ""
+        # Raw UTF-8 plan text; an mmap for plans over _MMAP_THRESHOLD
+        self.content: bytes = b""
+        self.sections: Dict[str, Tuple[int, int]] = {}
         self.specification = {}
         self.context_loading = []
         self.task_groups: List[TaskGroup] = []
@@ -91,22 +369,27 @@ class PlanParser:
         if not self.plan_path.exists():
             raise FileNotFoundError(f"Plan not found: {self.plan_path}")
         
-        with open(self.plan_path, 'r', encoding='utf-8') as f:
-            self.content = f.read()
+        with open(self.plan_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                content = f.read()
+        
+        # Match text-mode reading, which translates any line ending to '\n'
+        if content.find(b'\r') != -1:
+            content = content[:].replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        self.content = content
         
+        self.sections = _split_sections(self.content)
         self._parse_specification()
         self._parse_context_loading()
         self._parse_tasks()
     
     def _parse_specification(self) -> None:
         """Extract specification section."""
-        spec_match = re.search(
-            r'## Specification\n(.*?)(?=##|\Z)',
-            self.content,
-            re.DOTALL
-        )
-        if spec_match:
-            spec_text = spec_match.group(1)
+        bounds = self.sections.get('Specification')
+        if bounds:
+            spec_text = self.content[bounds[0]:bounds[1]]
             self.specification = {
                 'goal': self._extract_field(spec_text, 'Goal'),
                 'success_criteria': self._extract_list(spec_text, 'Success Criteria'),
@@ -116,40 +399,21 @@ class PlanParser:
     
     def _parse_context_loading(self) -> None:
         """Extract context loading commands."""
-        context_match = re.search(
-            r'## Context Loading\n(.*?)(?=##|\Z)',
-            self.content,
-            re.DOTALL
-        )
-        if context_match:
-            context_text = context_match.group(1)
-            code_blocks = re.findall(r'```bash\n(.*?)```', context_text, re.DOTALL)
-            self.context_loading = [cmd.strip() for cmd in code_blocks if cmd.strip()]
+        bounds = self.sections.get('Context Loading')
+        if bounds:
+            context_text = self.content[bounds[0]:bounds[1]]
+            code_blocks = _RE_CODE_BASH.findall(context_text)
+            self.context_loading = [cmd.strip().decode() for cmd in code_blocks if cmd.strip()]
     
     def _parse_tasks(self) -> None:
         """Parse tasks and group them by subsystem."""
-        # Find the '## Tasks' section - only parse content within this section
-        tasks_match = re.search(
-            r'## Tasks\n(.*)',
-            self.content,
-            re.DOTALL
-        )
-
-        if not tasks_match:
+        bounds = self.sections.get('Tasks')
+        if not bounds:
             return
 
-        tasks_content = tasks_match.group(1)
-        # Find where the next '## ' section starts and trim
-        next_section = re.search(r'\n## ', tasks_content)
-        if next_section:
-            tasks_content = tasks_content[:next_section.start()]
-
-        lines_list = tasks_content.split('\n')
-
-        current_subsystem = "General"
-        current_group: Optional[TaskGroup] = None
-        task_id = 1
-        i = 0
+        # Tasks is the last section; '## ' headings after it start subsystems.
+        # Groups are scheduled by name, so a repeated heading (e.g. from
+        # PlanGenerator.add_task_group) continues the existing group
 
         # Create default group for tasks without subsystem headers
         current_group = TaskGroup(
@@ -157,113 +421,80 @@ class PlanParser:
             subsystem="General"
         )
         self.task_groups.append(current_group)
-
-        while i < len(lines_list):
-            line = lines_list[i]
-
-            # Check for subsystem header (## Something that's not 'Tasks')
-            subsystem_match = re.match(r'^##\s+(.+)$', line)
-            if subsystem_match:
-                subsystem_name = subsystem_match.group(1).strip()
-                if subsystem_name != 'Tasks':
-                    current_subsystem = subsystem_name
-                    current_group = TaskGroup(
-                        name=subsystem_name,
-                        subsystem=subsystem_name
-                    )
-                    self.task_groups.append(current_group)
-
-            # Check for task header
-            task_match = re.match(r'^### Task\s+(\d+):\s*(.+)$', line)
-            if task_match:
-                task_num = task_match.group(1)
-                task_name = task_match.group(2).strip()
-
-                context = ""
-                steps = []
-                verify = ""
-
-                i += 1
-                while i < len(lines_list):
-                    task_line = lines_list[i]
-
-                    if task_line.startswith('**Context:**'):
-                        context_match = re.search(r'`([^`]+)`', task_line)
-                        if context_match:
-                            context = context_match.group(1)
-
-                    elif task_line.startswith('**Steps:**'):
-                        i += 1
-                        while i < len(lines_list) and not lines_list[i].startswith('**Verify:**'):
-                            step_match = re.match(r'^\d+\.\s*\[\s*[x ]?\s*\]\s*(.+)$', lines_list[i])
-                            if step_match:
-                                steps.append(step_match.group(1).strip())
-                            i += 1
-                        continue
-
-                    elif task_line.startswith('**Verify:**'):
-                        verify_match = re.search(r'`([^`]+)`', task_line)
-                        if verify_match:
-                            verify = verify_match.group(1)
-                        break
-
-                    elif task_line.startswith('###') or task_line.startswith('##'):
-                        break
-
-                    i += 1
-
+        groups_by_name = {current_group.name: current_group}
+        task: Optional[Task] = None
+
+        for event in _iter_task_events(self.content, bounds[0], len(self.content)):
+            kind = event[0]
+            if kind == 'step':
+                task.steps.append(event[1])
+            elif kind == 'task':
                 task = Task(
-                    id=f"task-{task_num}",
-                    name=task_name,
-                    context=context,
-                    steps=steps,
-                    verify=verify
+                    id=f"task-{event[1]}",
+                    name=event[2],
+                    context="",
+                    steps=[],
+                    verify=""
                 )
-
+                current_group.add_task(task)
+            elif kind == 'context':
+                if event[1] is not None:
+                    task.context = event[1]
+            elif kind == 'verify':
+                if event[1] is not None:
+                    task.verify = event[1]
+            elif kind == 'subsystem':
+                current_group = groups_by_name.get(event[1])
                 if current_group is None:
                     current_group = TaskGroup(
-                        name="General",
-                        subsystem="General"
+                        name=event[1],
+                        subsystem=event[1]
                     )
                     self.task_groups.append(current_group)
+                    groups_by_name[event[1]] = current_group
+            elif kind == 'depends':
+                current_group.dependencies.extend(event[1])
 
-                current_group.add_task(task)
-                task_id += 1
-
-            i += 1
-
-    def _extract_field(self, text: str, field: str, default: str = "") -> str:
+    def _extract_field(self, text: bytes, field: str, default: str = "") -> str:
         """Extract a field value from text."""
-        pattern = rf'\*\*{field}:\*\*\s*([^\n\*]+)'
-        match = re.search(pattern, text)
-        return match.group(1).strip() if match else default
+        match = _field_pattern(field).search(text)
+        return match.group(1).strip().decode() if match else default
     
-    def _extract_list(self, text: str, field: str) -> List[str]:
+    def _extract_list(self, text: bytes, field: str) -> List[str]:
         """Extract a list of items from text."""
         items = []
-        pattern = rf'\*\*{field}:\*\*\s*\n((?:-\s*\[\s*[x ]?\s*\].+\n)+)'
-        match = re.search(pattern, text, re.MULTILINE)
+        match = _list_pattern(field).search(text)
         if match:
             list_text = match.group(1)
-            items = re.findall(r'-\s*\[\s*[x ]?\s*\]\s*(.+)', list_text)
+            items = [item.decode() for item in _RE_LIST_ITEM.findall(list_text)]
         return items
 
 
+def _format_ts(ns: int) -> str:
+    """Format an execution log ``ts_ns`` timestamp for display."""
+    return datetime.fromtimestamp(ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+
+
 class PlanExecutor:
     """Executes implementation plans with smart task grouping."""
     
     def __init__(self, plan_path: Path, batch_size: int = 3, 
                  dry_run: bool = False, verbose: bool = True):
         self.plan_path = plan_path
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size)
         self.dry_run = dry_run
         self.verbose = verbose
         self.parser = PlanParser(plan_path)
         self.completed_groups: set = set()
         self.failed_groups: set = set()
+        # Entries are {'ts_ns', 'level', 'message'}; format ts_ns with _format_ts
         self.execution_log: List[Dict] = []
+        self.in_degree: Dict[str, int] = {}
+        self.successors: Dict[str, List[str]] = {}
+        # Set when a group fails so groups running alongside it stop early
+        self._abort = asyncio.Event()
     
-    def execute(self) -> bool:
+    async def execute(self) -> bool:
         """Execute the implementation plan."""
         self._log("info", f"Starting execution of plan: {self.plan_path.name}")
         
@@ -280,8 +511,8 @@ class PlanExecutor:
             return True
         
         self._update_plan_status("IN_PROGRESS")
-        self._execute_context_loading()
-        success = self._execute_task_groups()
+        await self._execute_context_loading()
+        success = await self._execute_task_groups()
         
         final_status = "COMPLETED" if success else "FAILED"
         self._update_plan_status(final_status)
@@ -305,119 +536,203 @@ class PlanExecutor:
             print(f"  - {group.name}: {len(group.tasks)} tasks")
         print(f"{'='*60}\n")
     
-    def _execute_context_loading(self) -> None:
+    async def _execute_context_loading(self) -> None:
         """Execute context loading commands."""
         if not self.parser.context_loading:
             return
         
         self._log("info", "Loading context...")
         
-        for cmd in self.parser.context_loading:
-            if self.verbose:
-                print(f"  $ {cmd}")
-            
-            if not self.dry_run:
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    if result.returncode != 0 and self.verbose:
-                        print(f"    Warning: Command failed")
-                except Exception as e:
-                    if self.verbose:
-                        print(f"    Error: {e}")
-    
-    def _execute_task_groups(self) -> bool:
+        shell = ShellWorker()
+        try:
+            for cmd in self.parser.context_loading:
+                if self.verbose:
+                    print(f"  $ {cmd}")
+                
+                if not self.dry_run:
+                    try:
+                        returncode, _, _ = await shell.run(
+                            cmd, timeout=30, capture_stdout=self.verbose
+                        )
+                        if returncode != 0 and self.verbose:
+                            print(f"    Warning: Command failed")
+                    except Exception as e:
+                        if self.verbose:
+                            print(f"    Error: {e}")
+        finally:
+            await shell.close()
+    
+    async def _execute_task_groups(self) -> bool:
         """Execute task groups in dependency order."""
-        self._build_dependencies()
+        if not self._build_dependencies():
+            return False
+        
+        cycle = self._detect_cycle()
+        if cycle:
+            self._log("error", f"Cycle: {' -> '.join(cycle)}")
+            return False
         
-        max_iterations = len(self.parser.task_groups) * 2
-        iteration = 0
+        groups = {g.name: g for g in self.parser.task_groups}
+        ready = deque(name for name, degree in self.in_degree.items() if degree == 0)
         
-        while len(self.completed_groups) < len(self.parser.task_groups):
-            if iteration >= max_iterations:
-                self._log("error", "Maximum iterations reached - possible circular dependency")
-                return False
-            
-            ready_groups = [
-                g for g in self.parser.task_groups
-                if g.status == TaskStatus.PENDING and g.is_ready(self.completed_groups)
-            ]
-            
-            if not ready_groups:
-                if len(self.completed_groups) < len(self.parser.task_groups):
-                    self._log("error", "No ready groups found - possible unmet dependencies")
-                    return False
-                break
-            
-            batch = ready_groups[:self.batch_size]
+        while ready:
+            batch = [groups[ready.popleft()] for _ in range(min(self.batch_size, len(ready)))]
             
             if len(batch) == 1:
-                success = self._execute_group(batch[0])
+                success = await self._execute_group(batch[0])
             else:
-                success = self._execute_groups_parallel(batch)
+                success = await self._execute_groups_parallel(batch)
             
             if not success:
                 return False
             
-            iteration += 1
+            for group in batch:
+                for successor in self.successors[group.name]:
+                    self.in_degree[successor] -= 1
+                    if self.in_degree[successor] == 0:
+                        ready.append(successor)
         
         return True
     
-    def _build_dependencies(self) -> None:
-        """Build dependency graph between task groups."""
-        for i, group in enumerate(self.parser.task_groups):
-            if i > 0:
-                group.dependencies.append(self.parser.task_groups[i-1].name)
+    def _build_dependencies(self) -> bool:
+        """Build the in-degree table and successor lists between task groups."""
+        self.in_degree = {g.name: 0 for g in self.parser.task_groups}
+        self.successors = {name: [] for name in self.in_degree}
+        
+        for group in self.parser.task_groups:
+            for dep in dict.fromkeys(group.dependencies):
+                if dep not in self.in_degree:
+                    self._log("error", f"Group {group.name} depends on unknown group: {dep}")
+                    return False
+                if dep == group.name:
+                    # Usually a repeated '## X' section naming the earlier one
+                    self._log("error", f"Group {group.name} depends on itself "
+                                       f"(sections with the same name form one group)")
+                    return False
+                self.successors[dep].append(group.name)
+                self.in_degree[group.name] += 1
+        
+        return True
     
-    def _execute_group(self, group: TaskGroup) -> bool:
+    def _detect_cycle(self) -> Optional[List[str]]:
+        """
+        Find a dependency cycle with Tarjan's strongly connected components.
+
+        Returns the groups along one cycle, first group repeated at the end,
+        or None when the dependency graph is acyclic.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack = set()
+        
+        for root in self.successors:
+            if root in index:
+                continue
+            # Iterative DFS: (node, iterator over its successors)
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.successors[root]))]
+            while work:
+                node, successors = work[-1]
+                for succ in successors:
+                    if succ not in index:
+                        index[succ] = lowlink[succ] = len(index)
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(self.successors[succ])))
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = set()
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.add(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.successors[node]:
+                            return self._cycle_path(node, component)
+        return None
+    
+    def _cycle_path(self, start: str, component: set) -> List[str]:
+        """Follow successors inside a strongly connected component back to a visited group."""
+        path = [start]
+        seen = {start: 0}
+        node = start
+        while True:
+            node = next(s for s in self.successors[node] if s in component)
+            if node in seen:
+                return path[seen[node]:] + [node]
+            seen[node] = len(path)
+            path.append(node)
+    
+    async def _execute_group(self, group: TaskGroup) -> bool:
         """Execute a single task group."""
         self._log("info", f"Executing group: {group.name}")
         group.status = TaskStatus.IN_PROGRESS
         
-        for task in group.tasks:
-            success = self._execute_task(task, group)
-            
-            if not success:
-                group.status = TaskStatus.FAILED
-                self.failed_groups.add(group.name)
-                return False
-            
-            task.status = TaskStatus.COMPLETED
+        # Tasks in a group share one shell, and with it cwd and environment
+        group.shell = ShellWorker()
+        try:
+            for task in group.tasks:
+                success = await self._execute_task(task, group)
+                
+                if not success:
+                    group.status = TaskStatus.FAILED
+                    self.failed_groups.add(group.name)
+                    return False
+                
+                task.status = TaskStatus.COMPLETED
+        finally:
+            await group.shell.close()
+            group.shell = None
         
         group.status = TaskStatus.COMPLETED
         self.completed_groups.add(group.name)
         self._log("success", f"Completed group: {group.name}")
         return True
     
-    def _execute_groups_parallel(self, groups: List[TaskGroup]) -> bool:
-        """Execute multiple task groups in parallel."""
+    async def _execute_groups_parallel(self, groups: List[TaskGroup]) -> bool:
+        """Execute multiple task groups concurrently on the event loop."""
         self._log("info", f"Executing {len(groups)} groups in parallel...")
         
-        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
-            futures = {executor.submit(self._execute_group, g): g for g in groups}
-            
-            for future in as_completed(futures):
-                group = futures[future]
-                try:
-                    success = future.result()
-                    if not success:
-                        for f in futures:
-                            f.cancel()
-                        return False
-                except Exception as e:
-                    self._log("error", f"Group {group.name} failed with exception: {e}")
-                    group.status = TaskStatus.FAILED
-                    self.failed_groups.add(group.name)
-                    return False
+        results = await asyncio.gather(
+            *(self._execute_group_or_abort(g) for g in groups),
+            return_exceptions=True
+        )
+        success = True
         
-        return True
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                self._log("error", f"Group {group.name} failed with exception: {result}")
+                group.status = TaskStatus.FAILED
+                self.failed_groups.add(group.name)
+                success = False
+            elif not result:
+                success = False
+        
+        return success
+    
+    async def _execute_group_or_abort(self, group: TaskGroup) -> bool:
+        """Execute a group, signalling the rest of its batch to stop on failure."""
+        try:
+            success = await self._execute_group(group)
+        except Exception:
+            self._abort.set()
+            raise
+        if not success:
+            self._abort.set()
+        return success
     
-    def _execute_task(self, task: Task, group: TaskGroup) -> bool:
+    async def _execute_task(self, task: Task, group: TaskGroup) -> bool:
         """Execute a single task."""
         self._log("info", f"  Task: {task.name}")
         task.status = TaskStatus.IN_PROGRESS
@@ -428,6 +743,11 @@ class PlanExecutor:
         
         # Execute steps
         for step in task.steps:
+            if self._abort.is_set():
+                task.error = "Aborted after another group failed"
+                self._log("error", f"    Task aborted: {task.name}")
+                return False
+            
             if self.verbose:
                 print(f"    Step: {step}")
             
@@ -437,16 +757,12 @@ class PlanExecutor:
                 try:
                     # Check if step is a command
                     if step.startswith('$') or step.startswith('git') or step.startswith('npm') or step.startswith('python'):
-                        result = subprocess.run(
-                            step,
-                            shell=True,
-                            capture_output=True,
-                            text=True,
-                            timeout=60
+                        returncode, _, stderr = await group.shell.run(
+                            step, timeout=60, capture_stdout=self.verbose
                         )
-                        if result.returncode != 0:
-                            task.error = result.stderr
-                            self._log("error", f"    Step failed: {result.stderr}")
+                        if returncode != 0:
+                            task.error = stderr
+                            self._log("error", f"    Step failed: {stderr}")
                             return False
                 except Exception as e:
                     task.error = str(e)
@@ -459,16 +775,12 @@ class PlanExecutor:
         
         if not self.dry_run and task.verify:
             try:
-                result = subprocess.run(
-                    task.verify,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=60
+                returncode, _, stderr = await group.shell.run(
+                    task.verify, timeout=60, capture_stdout=self.verbose
                 )
-                if result.returncode != 0:
-                    task.error = result.stderr
-                    self._log("error", f"    Verification failed: {result.stderr}")
+                if returncode != 0:
+                    task.error = stderr
+                    self._log("error", f"    Verification failed: {stderr}")
                     return False
             except Exception as e:
                 task.error = str(e)
@@ -483,28 +795,27 @@ class PlanExecutor:
         if self.dry_run:
             return
         
+        # The first Status field is the plan header; later ones belong to tasks
         content = self.parser.content
-        content = re.sub(
-            r'\*\*Status:\*\*\s*\w+',
-            f'**Status:** {status}',
-            content
-        )
-        content = re.sub(
-            r'\*\*Status:\*\*\s*DRAFT',
-            f'**Status:** {status}',
-            content
-        )
+        match = _RE_STATUS.search(content)
+        replacement = f'**Status:** {status}'.encode()
+        if match is None or match.group(0) == replacement:
+            return
         
-        with open(self.plan_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        updated = b''.join((content[:match.start()], replacement, content[match.end():]))
+        # Rewriting the file truncates it, so drop the mapping first
+        if isinstance(content, mmap.mmap):
+            content.close()
+        with open(self.plan_path, 'wb') as f:
+            f.write(updated)
+        self.parser.content = updated
     
     def _log(self, level: str, message: str) -> None:
         """Log a message."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = {
-            'timestamp': timestamp,
-            'level': level,
-            'message': message
+            "ts_ns": time.time_ns(),
+            "level": level,
+            "message": message
         }
         self.execution_log.append(log_entry)
         
@@ -536,6 +847,8 @@ def list_plans() -> None:
 
 def main():
     """Main entry point."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Execute Agent Zero implementation plans",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -601,7 +914,14 @@ Examples:
         verbose=not args.quiet
     )
     
-    success = executor.execute()
+    # uvloop's libuv loop reaps pipe reads for all workers with less overhead;
+    # uvloop.run only exists from uvloop 0.18
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    run = getattr(uvloop, "run", None) or asyncio.run
+    success = run(executor.execute())
     sys.exit(0 if success else 1)
 
 
@@ -1,21 +1,250 @@
-import subprocess
+import atexit
+import functools
+import itertools
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+else:
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
 
 # The MCP configuration file is expected to be in the project directory.
 # However, the memory server itself is configured to store data in a global location.
 MCP_CONFIG_PATH = "/home/shayne/agent-zero/usr/projects/agent_zero_enhancements_and_extensions/mcp.json"
 MEMORY_SERVER_NAME = "memory"
 GLOBAL_MEMORY_FILE = "/home/shayne/agent-zero/memory.jsonl"
+MCP_PROTOCOL_VERSION = "2024-11-05"
+MCP_TIMEOUT = 30
+
+# Entity fields accepted by the MCP memory schema, in schema order
+_ALLOWED_FIELDS = ('name', 'entityType', 'observations')
+
+
+class MemoryServerClient:
+    """
+    Persistent stdio connection to the MCP memory server.
+
+    Speaks MCP JSON-RPC directly to the server process configured in
+    mcp.json, so each tool call is a line written to its stdin instead of
+    a new mcpl process. Requests carry ids and a reader thread files
+    responses by id, so concurrent callers can share the connection and
+    call_batch can pipeline several requests before waiting.
+    """
+
+    def __init__(self, server_config):
+        import subprocess
+
+        env = os.environ.copy()
+        env["PATH"] = "/root/.local/bin:" + env.get("PATH", "")
+        env.update(server_config.get("env") or {})
+
+        self.proc = subprocess.Popen(
+            [server_config["command"], *server_config.get("args", [])],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env
+        )
+        self._ids = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._responses = {}
+        # Ids of timed-out requests; their late responses are dropped
+        self._abandoned = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="MemoryServerReader", daemon=True)
+        self._reader.start()
+
+        response = self._request("initialize", {
+            "protocolVersion": MCP_PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "agent-zero-memory-manager", "version": "1.0"}
+        })
+        if "error" in response:
+            self.close()
+            raise ConnectionError(f"MCP initialize failed: {response['error']}")
+        self._send([{"jsonrpc": "2.0", "method": "notifications/initialized"}])
+
+    def _read_loop(self):
+        """File responses by request id until the server closes stdout."""
+        for line in self.proc.stdout:
+            try:
+                message = _loads(line)
+            except json.JSONDecodeError:
+                continue
+            # Server notifications and requests have no result to deliver
+            if "id" in message and ("result" in message or "error" in message):
+                with self._cond:
+                    request_id = message["id"]
+                    if request_id in self._abandoned:
+                        self._abandoned.discard(request_id)
+                        continue
+                    self._responses[request_id] = message
+                    self._cond.notify_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _send(self, messages):
+        """Write JSON-RPC messages to the server in a single flush."""
+        data = b"".join(_dumps(m) + b"\n" for m in messages)
+        with self._write_lock:
+            self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+
+    def _wait(self, request_id, deadline):
+        """Wait for the response to a request, or an error dict."""
+        with self._cond:
+            while request_id not in self._responses:
+                if self._closed:
+                    return {"error": "MCP server exited"}
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._abandoned.add(request_id)
+                    return {"error": "MCP server timeout"}
+                self._cond.wait(remaining)
+            return self._responses.pop(request_id)
+
+    def _request(self, method, params):
+        request_id = next(self._ids)
+        self._send([{"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}])
+        return self._wait(request_id, time.monotonic() + MCP_TIMEOUT)
+
+    @property
+    def alive(self):
+        return not self._closed and self.proc.poll() is None
+
+    def call(self, tool_name, arguments):
+        """Call a tool and return its decoded result."""
+        return self.call_batch([(tool_name, arguments)])[0]
+
+    def call_batch(self, calls):
+        """
+        Call several tools with one write, then collect the results in order.
+        """
+        request_ids = [next(self._ids) for _ in calls]
+        self._send([
+            {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+             "params": {"name": tool_name, "arguments": arguments}}
+            for request_id, (tool_name, arguments) in zip(request_ids, calls)
+        ])
+        deadline = time.monotonic() + MCP_TIMEOUT
+        return [_decode_tool_response(self._wait(request_id, deadline)) for request_id in request_ids]
+
+    def close(self):
+        """Stop the server process."""
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+                self.proc.wait()
+
+
+def _decode_tool_response(response):
+    """
+    Convert a tools/call JSON-RPC response into the dicts mcpl returns.
+    """
+    if "error" in response:
+        error = response["error"]
+        return {"error": error.get("message", str(error)) if isinstance(error, dict) else error}
+
+    result = response["result"]
+    text = "".join(item.get("text", "") for item in result.get("content", [])
+                   if item.get("type") == "text")
+    if result.get("isError"):
+        return {"error": text}
+    if "structuredContent" in result:
+        return result["structuredContent"]
+    try:
+        return _loads(text)
+    except json.JSONDecodeError:
+        return {"raw_output": text}
+
+
+_client = None
+_client_lock = threading.Lock()
+# Set when the configured server cannot be started, so calls go straight to mcpl
+_client_unavailable = False
+# Set while one thread starts the server; others use mcpl instead of waiting
+_client_starting = False
+
+
+def _get_client():
+    """
+    Return the shared memory server client, starting it on first use.
+
+    Returns None when mcp.json has no stdio command for the memory server,
+    the server fails to start, or another thread is still starting it;
+    callers then fall back to mcpl. The lock is never held while the
+    server initializes, which can take up to MCP_TIMEOUT.
+    """
+    global _client, _client_unavailable, _client_starting
+    client = _client
+    if client is not None and client.alive:
+        return client
+    with _client_lock:
+        if _client is not None and _client.alive:
+            return _client
+        if _client_unavailable or _client_starting:
+            return None
+        _client_starting = True
+
+    try:
+        with open(MCP_CONFIG_PATH, "r") as f:
+            server_config = json.load(f).get("mcpServers", {}).get(MEMORY_SERVER_NAME)
+        if not server_config or "command" not in server_config:
+            raise ValueError("memory server has no stdio command")
+        client = MemoryServerClient(server_config)
+    except Exception:
+        client = None
+
+    with _client_lock:
+        _client_starting = False
+        if client is None:
+            _client_unavailable = True
+            return None
+        _client = client
+    atexit.register(client.close)
+    return client
+
 
 def _call_mcpl_memory(tool_name, arguments):
     """
-    Internal helper to call the MCP memory server using mcpl.
+    Internal helper to call the MCP memory server.
+
+    Uses the persistent server connection when available and falls back to
+    one mcpl process per call otherwise.
     """
     if not os.path.exists(MCP_CONFIG_PATH):
         return {"error": "MCP config not found. Please configure MCP first."}
 
-    cmd = ["mcpl", "call", MEMORY_SERVER_NAME, tool_name, json.dumps(arguments)]
+    client = _get_client()
+    if client is not None:
+        try:
+            return client.call(tool_name, arguments)
+        except Exception as e:
+            return {"error": str(e)}
+
+    import subprocess
+
+    cmd = ["mcpl", "call", MEMORY_SERVER_NAME, tool_name, _dumps(arguments).decode("utf-8")]
     
     # Ensure PATH includes mcpl
     env = os.environ.copy()
@@ -29,10 +258,10 @@ def _call_mcpl_memory(tool_name, arguments):
             
         # Parse the JSON output from mcpl
         try:
-            output_data = json.loads(result.stdout)
+            output_data = _loads(result.stdout)
             # mcpl wraps the actual result in a "result" string sometimes
             if "result" in output_data and isinstance(output_data["result"], str):
-                return json.loads(output_data["result"])
+                return _loads(output_data["result"])
             return output_data
         except json.JSONDecodeError:
             return {"raw_output": result.stdout}
@@ -53,18 +282,115 @@ def _sanitize_entity(entity):
         return entity
     
     # Only keep allowed fields according to schema
-    allowed_fields = {'name', 'entityType', 'observations'}
-    sanitized = {}
-    
-    for key, value in entity.items():
-        if key in allowed_fields:
-            sanitized[key] = value
-    
-    return sanitized
+    return {key: entity[key] for key in _ALLOWED_FIELDS if key in entity}
+
+# Bumped by every write so cached reads from before it are never served
+_generation = 0
+
+
+def _copy_result(result):
+    """Copy a cached result's dict and its top-level lists for one caller"""
+    if not isinstance(result, dict):
+        return result
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in result.items()}
+
+
+def _ttl_cache(maxsize=256, ttl=30.0):
+    """
+    Cache results per call arguments for ttl seconds, bounded LRU.
+
+    Keyword and positional calls share cache entries. The memory generation
+    is part of each key, so add_memory invalidates everything cached before
+    it. Error results are not cached. Every caller gets its own copy of the
+    result dict and its lists; the entity dicts inside are shared.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        signature = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal signature
+            if kwargs:
+                # Imported here: inspect is slow to import and keyword calls are rare
+                if signature is None:
+                    import inspect
+                    signature = inspect.signature(func)
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                args = bound.args
+            key = (_generation, args)
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and time.monotonic() < entry[1]:
+                    cache.move_to_end(key)
+                    return _copy_result(entry[0])
+
+            result = func(*args)
+            if isinstance(result, dict) and "error" in result:
+                return result
+
+            with lock:
+                cache[key] = (result, time.monotonic() + ttl)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return _copy_result(result)
 
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+# Lowercased searchable text of every entity in the last read_full_graph
+# snapshot, with its expiry; None until the graph has been read
+_graph_index = None
+GRAPH_INDEX_TTL = 30.0
+
+
+def _index_graph(entities):
+    """
+    Snapshot the text search_nodes matches against: names, types, observations.
+    """
+    global _graph_index
+    texts = []
+    for entity in entities:
+        if isinstance(entity, dict):
+            _index_entity(texts, entity.get("name"), entity.get("entityType"), entity.get("observations"))
+    _graph_index = (time.monotonic() + GRAPH_INDEX_TTL, texts)
+
+
+def _index_entity(texts, name, entity_type, observations):
+    for value in (name, entity_type, *(observations or ())):
+        if isinstance(value, str):
+            texts.append(value.lower())
+
+
+def _graph_may_match(query):
+    """
+    Return False only when the graph snapshot proves search_nodes finds nothing.
+
+    search_nodes matches case-insensitive substrings of entity names, types
+    and observations, so a query found in none of the indexed text has no
+    results. Without a current snapshot every query may match.
+    """
+    index = _graph_index
+    if index is None or time.monotonic() >= index[0]:
+        return True
+    query = query.lower()
+    return any(query in text for text in index[1])
+
+
+@_ttl_cache(maxsize=256, ttl=30.0)
 def search_memory(query):
     """
     Search the memory graph for entities, relations, and observations matching the query.
+
+    Results are cached briefly (see _ttl_cache). The returned dict and its
+    lists are the caller's own, but the entity dicts in them are shared
+    with the cache and must not be modified.
     """
     result = _call_mcpl_memory("search_nodes", {"query": query})
     
@@ -91,6 +417,9 @@ def add_memory(entity_name, observations):
     Add observations to an existing entity.
     Creates the entity if it doesn't exist.
     """
+    global _generation
+    _generation += 1
+
     # First, try to add observations. If entity doesn't exist, create it.
     result = _call_mcpl_memory("add_observations", {
         "observations": [{
@@ -101,14 +430,18 @@ def add_memory(entity_name, observations):
     
     if "error" in result and "not found" in result.get("error", "").lower():
         # Entity likely doesn't exist, create it
-        create_result = _call_mcpl_memory("create_entities", {
+        result = _call_mcpl_memory("create_entities", {
             "entities": [{
                 "name": entity_name,
                 "entityType": "general",
                 "observations": observations if isinstance(observations, list) else [observations]
             }]
         })
-        return create_result
+
+    # Keep the graph snapshot a superset of what the server can match
+    if _graph_index is not None and "error" not in result:
+        _index_entity(_graph_index[1], entity_name, "general",
+                      observations if isinstance(observations, list) else [observations])
         
     return result
 
@@ -123,19 +456,30 @@ def read_full_graph():
     # Sanitize entities
     if "entities" in result:
         result["entities"] = [_sanitize_entity(e) for e in result["entities"]]
+        _index_graph(result["entities"])
     
     return result
 
+@_ttl_cache(maxsize=256, ttl=30.0)
 def get_context_for_project(project_name):
     """
     Retrieve relevant memory context for a specific project or task.
+
+    Cached like search_memory: the returned dict and its lists are the
+    caller's own, but the entity dicts in them must not be modified.
     """
-    # Search for project name and general capabilities
-    results = search_memory(project_name)
+    # Search for project name and general capabilities; searches the graph
+    # snapshot proves empty are answered without a server call
+    if _graph_may_match(project_name):
+        results = search_memory(project_name)
+    else:
+        results = {"entities": [], "relations": []}
     
     # If no specific results, return general system knowledge
     if not results or ("entities" in results and len(results["entities"]) == 0):
-        return search_memory("Agent Zero")
+        if _graph_may_match("Agent Zero"):
+            return search_memory("Agent Zero")
+        return {"entities": [], "relations": []}
         
     return results
 
@@ -9,23 +9,189 @@ Updated to fix issues with project creation not appearing in project picker.
 
 import os
 import json
-from datetime import datetime
-from typing import Dict, Optional, Tuple
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_log = logging.getLogger("newproject")
+
+if orjson is not None:
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+else:
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, indent=2).encode("utf-8")
+
+
+DEFAULT_GITIGNORE_PATH = "/home/shayne/agent-zero/conf/projects.default.gitignore"
+
+# Contents of the default gitignore, read once per process
+_gitignore_cache: Optional[str] = None
+
+# Serialized project.json settings that are the same for every project
+_project_json_tail_cache: Optional[bytes] = None
+
+# Shared pool for writing a project's metadata files concurrently
+_io_pool: Optional[ThreadPoolExecutor] = None
+_io_pool_lock = threading.Lock()
+
+# Characters not allowed in a project directory name: anything that isn't
+# alphanumeric (str.isalnum, so including non-ASCII letters), "_" or "-".
+# str.translate with a deletion table was measured slower than this for
+# typical names: every character goes through a dict lookup.
+_RE_INVALID_NAME_CHARS = re.compile(r"[^\w-]+")
+
+# Project base directories already created by this process
+_ensured_base_dirs: Set[str] = set()
+
+# Longest directory name most filesystems accept (NAME_MAX), in bytes
+_MAX_NAME_BYTES = 255
+
+# Fields a create_projects spec may contain (create_project's parameters)
+_PROJECT_SPEC_KEYS = frozenset(("name", "title", "description", "instructions", "color"))
+
+# Directories of a new project, relative to the project root, parents
+# before children so each needs a single mkdir. knowledge lives at the
+# project root (not in .a0proj). Paths are built by concatenation from a
+# normalized root rather than os.path.join, and as bytes: the root is
+# fs-encoded once per project instead of on every syscall.
+_SEP = os.fsencode(os.sep)
+_PROJECT_DIRS = (
+    b".a0proj",
+    b".a0proj" + _SEP + b"instructions",
+    b"knowledge",
+    b"knowledge" + _SEP + b"main",
+    b"knowledge" + _SEP + b"longterm",
+    b"knowledge" + _SEP + b"volatile",
+)
+
+
+def _load_gitignore() -> str:
+    """Return the default project gitignore, or "" if it cannot be read."""
+    global _gitignore_cache
+    if _gitignore_cache is None:
+        try:
+            with open(DEFAULT_GITIGNORE_PATH, "r") as f:
+                _gitignore_cache = f.read()
+        except (OSError, UnicodeDecodeError):
+            _gitignore_cache = ""
+    return _gitignore_cache
+
+
+def _project_json_tail() -> bytes:
+    """Return the constant end of project.json, from "memory" to the closing brace."""
+    global _project_json_tail_cache
+    if _project_json_tail_cache is None:
+        # Drop the opening brace so the tail can follow the per-project keys
+        _project_json_tail_cache = _dumps({
+            "memory": "own",
+            "file_structure": {
+                "enabled": True,
+                "max_depth": 5,
+                "max_files": 20,
+                "max_folders": 20,
+                "max_lines": 250,
+                "gitignore": _load_gitignore()
+            }
+        })[1:]
+    return _project_json_tail_cache
+
+
+def _encode_project_json(title: str, description: str, instructions: str, color: str) -> bytes:
+    """
+    Serialize project.json, encoding only the per-project values.
+    
+    The output is identical to dumping the full project dict.
+    """
+    return b"".join((
+        b'{\n  "title": ', _dumps(title),
+        b',\n  "description": ', _dumps(description),
+        b',\n  "instructions": ', _dumps(instructions),
+        b',\n  "color": ', _dumps(color),
+        b",", _project_json_tail(),
+    ))
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    """Return the shared file-writing pool, creating it on first use."""
+    global _io_pool
+    if _io_pool is None:
+        with _io_pool_lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="newproject-io")
+    return _io_pool
+
+
+def _write_file(path: bytes, data: bytes) -> None:
+    """Write data to path in full, bypassing the buffered io layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _fast_mkdir(path: bytes) -> None:
+    """
+    Create a directory if it does not exist, along with missing parents.
+    
+    A plain mkdir is tried first; makedirs, which stats every level, only
+    runs when a parent is missing.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not os.path.isdir(path):
+            raise
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+def _make_project_dirs(root: bytes) -> None:
+    """Create the directories of a project inside a new, empty root (normalized, fs-encoded)."""
+    prefix = root + _SEP
+    for path in _PROJECT_DIRS:
+        os.mkdir(prefix + path)
 
 
 class NewProjectEnhancement:
     """Enhancement for creating new Agent Zero projects."""
     
-    def __init__(self, base_dir: str = "/home/shayne/agent-zero/usr/projects"):
+    def __init__(self, base_dir: str = "/home/shayne/agent-zero/usr/projects",
+                 write_reference_files: bool = False):
         """
         Initialize the NewProjectEnhancement.
         
         Args:
             base_dir: Base directory for projects
+            write_reference_files: Also write description.txt and instructions.md
+                next to project.json (nothing in Agent Zero reads them)
         """
         self.base_dir = base_dir
         self.default_color = "#9ef01a"
+        self.write_reference_files = write_reference_files
         
+    def _ensure_base_dir(self) -> None:
+        """Create base_dir on first use, once per process."""
+        # create_new_project builds an instance per call, so the check is
+        # remembered per process rather than done in __init__
+        if self.base_dir in _ensured_base_dirs:
+            return
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            _ensured_base_dirs.add(self.base_dir)
+        except OSError as e:
+            _log.warning("Cannot create projects directory %s: %s", self.base_dir, e)
+    
     def sanitize_project_name(self, name: str) -> str:
         """
         Sanitize the project name for use as a directory name.
@@ -36,11 +202,9 @@ class NewProjectEnhancement:
         Returns:
             Sanitized project name
         """
-        # Convert to lowercase and replace spaces with underscores
-        sanitized = name.lower().strip().replace(" ", "_")
-        # Remove any characters that aren't alphanumeric, underscores, or hyphens
-        sanitized = "".join(c for c in sanitized if c.isalnum() or c in "_-")
-        return sanitized
+        # Convert to lowercase and replace spaces with underscores, then
+        # remove any characters that aren't alphanumeric, underscores, or hyphens
+        return _RE_INVALID_NAME_CHARS.sub("", name.lower().strip().replace(" ", "_"))
     
     def create_project_structure(self, project_path: str) -> bool:
         """
@@ -53,27 +217,14 @@ class NewProjectEnhancement:
             True if successful, False otherwise
         """
         try:
-            # Create main project directory
-            os.makedirs(project_path, exist_ok=True)
-            
-            # Create .a0proj directory and subdirectories
-            a0proj_path = os.path.join(project_path, ".a0proj")
-            os.makedirs(a0proj_path, exist_ok=True)
-            
-            # Create .a0proj subdirectories
-            os.makedirs(os.path.join(a0proj_path, "instructions"), exist_ok=True)
-            
-            # Create knowledge subdirectories at project root (not in .a0proj)
-            knowledge_path = os.path.join(project_path, "knowledge")
-            os.makedirs(knowledge_path, exist_ok=True)
-            
-            knowledge_subdirs = ["main", "longterm", "volatile"]
-            for subdir in knowledge_subdirs:
-                os.makedirs(os.path.join(knowledge_path, subdir), exist_ok=True)
-                
+            # The project may be missing or partly created, so each
+            # directory falls back to makedirs and tolerates existing ones
+            prefix = os.fsencode(os.path.normpath(project_path)) + _SEP
+            for path in _PROJECT_DIRS:
+                _fast_mkdir(prefix + path)
             return True
-        except Exception as e:
-            print(f"Error creating project structure: {e}")
+        except OSError as e:
+            _log.error("Error creating project structure at %s: %s", project_path, e.strerror or e)
             return False
     
     def create_project_metadata(self, project_path: str, title: str, description: str,
@@ -92,53 +243,72 @@ class NewProjectEnhancement:
             True if successful, False otherwise
         """
         try:
-            a0proj_path = os.path.join(project_path, ".a0proj")
-            
-            # Set default color if not provided
-            if color is None:
-                color = self.default_color
-            
-            # Read default gitignore if available
-            gitignore_content = ""
-            try:
-                with open("/home/shayne/agent-zero/conf/projects.default.gitignore", "r") as f:
-                    gitignore_content = f.read()
-            except:
-                pass
-            
-            # Create project.json with exact format expected by the system
-            project_data = {
-                "title": title,
-                "description": description,
-                "instructions": instructions,
-                "color": color,
-                "memory": "own",
-                "file_structure": {
-                    "enabled": True,
-                    "max_depth": 5,
-                    "max_files": 20,
-                    "max_folders": 20,
-                    "max_lines": 250,
-                    "gitignore": gitignore_content
-                }
-            }
-            
-            with open(os.path.join(a0proj_path, "project.json"), "w") as f:
-                json.dump(project_data, f, indent=2)
-            
-            # Create description.txt for reference
-            with open(os.path.join(a0proj_path, "description.txt"), "w") as f:
-                f.write(description)
-            
-            # Create instructions.md for reference
-            with open(os.path.join(a0proj_path, "instructions.md"), "w") as f:
-                f.write(f"# {title}\n\n{instructions}")
-                
+            self._write_metadata(os.fsencode(os.path.normpath(project_path)) + _SEP + b".a0proj",
+                                 title, description, instructions, color)
             return True
-        except Exception as e:
-            print(f"Error creating project metadata: {e}")
+        except OSError as e:
+            _log.error("Error creating project metadata at %s: %s", project_path, e.strerror or e)
             return False
     
+    def _write_metadata(self, a0proj_path: bytes, title: str, description: str,
+                        instructions: str, color: Optional[str]) -> None:
+        """Write the metadata files into an existing .a0proj directory."""
+        # Set default color if not provided
+        if color is None:
+            color = self.default_color
+        
+        # project.json in the exact format expected by the system
+        files = [(b"project.json", _encode_project_json(title, description, instructions, color))]
+        if self.write_reference_files:
+            # Plain-text copies for reference
+            files.append((b"description.txt", description.encode("utf-8")))
+            files.append((b"instructions.md", f"# {title}\n\n{instructions}".encode("utf-8")))
+        prefix = a0proj_path + _SEP
+        if len(files) == 1:
+            filename, data = files[0]
+            _write_file(prefix + filename, data)
+            return
+        
+        # The files are independent; overlap their open/write latency,
+        # which matters on network filesystems
+        pool = _get_io_pool()
+        futures = [pool.submit(_write_file, prefix + filename, data)
+                   for filename, data in files]
+        wait(futures)
+        for future in futures:
+            future.result()
+    
+    def _create_all(self, project_path: str, title: str, description: str,
+                    instructions: str, color: Optional[str]) -> Optional[str]:
+        """
+        Create a project's directory, structure and metadata in one pass.
+        
+        Raises FileExistsError if the project directory already exists.
+        
+        Returns:
+            None if successful, otherwise the failure message including
+            the OS error (e.g. "Permission denied", "No space left on device")
+        """
+        root = os.fsencode(os.path.normpath(project_path))
+        try:
+            # Claim the project directory; mkdir fails if the project
+            # already exists, so no separate existence check is needed
+            os.mkdir(root)
+            _make_project_dirs(root)
+        except FileExistsError:
+            raise
+        except OSError as e:
+            _log.error("Error creating project structure at %s: %s", project_path, e.strerror or e)
+            return f"Failed to create project structure: {e.strerror or e}"
+        
+        try:
+            self._write_metadata(root + _SEP + b".a0proj", title, description, instructions, color)
+        except OSError as e:
+            _log.error("Error creating project metadata at %s: %s", project_path, e.strerror or e)
+            return f"Failed to create project metadata: {e.strerror or e}"
+        
+        return None
+    
     def create_project(self, name: str, title: Optional[str] = None,
                        description: Optional[str] = None,
                        instructions: Optional[str] = None,
@@ -158,12 +328,13 @@ class NewProjectEnhancement:
         """
         # Sanitize the project name
         sanitized_name = self.sanitize_project_name(name)
+        # Nothing left after sanitizing, or too long to be a directory name:
+        # reject before touching the filesystem
+        if not sanitized_name or len(os.fsencode(sanitized_name)) > _MAX_NAME_BYTES:
+            return False, f"Invalid project name: '{name}'", None
+        self._ensure_base_dir()
         project_path = os.path.join(self.base_dir, sanitized_name)
         
-        # Check if project already exists
-        if os.path.exists(project_path):
-            return False, f"Project '{sanitized_name}' already exists at {project_path}", None
-        
         # Set defaults
         if title is None:
             title = name
@@ -172,15 +343,75 @@ class NewProjectEnhancement:
         if instructions is None:
             instructions = "This project is focused on developing and implementing solutions."
         
-        # Create project structure
-        if not self.create_project_structure(project_path):
-            return False, "Failed to create project structure", None
-        
-        # Create project metadata
-        if not self.create_project_metadata(project_path, title, description, instructions, color):
-            return False, "Failed to create project metadata", None
+        try:
+            error = self._create_all(project_path, title, description, instructions, color)
+        except FileExistsError:
+            return False, f"Project '{sanitized_name}' already exists at {project_path}", None
+        if error is not None:
+            return False, error, None
         
         return True, f"Project '{title}' created successfully at {project_path}", project_path
+    
+    def create_projects(self, specs: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Create several projects concurrently.
+        
+        Args:
+            specs: One dict of create_project keyword arguments per project
+                (``name`` is required)
+            
+        Returns:
+            One result dictionary per spec, in order, as from create_new_project;
+            a spec without a string ``name`` or with unknown fields gets a
+            failed result and creates nothing
+        """
+        if not specs:
+            return []
+        
+        # Check every spec before creating anything, so a bad one fails on
+        # its own instead of raising after other projects were created
+        results: List[Optional[Tuple[bool, str, Optional[str]]]] = [None] * len(specs)
+        valid = []
+        for i, spec in enumerate(specs):
+            error = _check_project_spec(spec)
+            if error is None:
+                valid.append(i)
+            else:
+                results[i] = (False, error, None)
+        
+        if valid:
+            # Overlap the per-project mkdir/write latency across projects
+            max_workers = min(16, (os.cpu_count() or 1) * 2, len(valid))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                created = executor.map(lambda i: self.create_project(**specs[i]), valid)
+                for i, result in zip(valid, created):
+                    results[i] = result
+        
+        return [_result_dict(spec.get("name") if isinstance(spec, dict) else None, result)
+                for spec, result in zip(specs, results)]
+
+
+def _check_project_spec(spec: Any) -> Optional[str]:
+    """Return why a create_projects spec is unusable, or None if it is valid."""
+    if not isinstance(spec, dict):
+        return f"Invalid project spec: expected a dict, got {type(spec).__name__}"
+    if not isinstance(spec.get("name"), str):
+        return "Invalid project spec: 'name' is required and must be a string"
+    unknown = spec.keys() - _PROJECT_SPEC_KEYS
+    if unknown:
+        return f"Invalid project spec: unknown field(s) {', '.join(sorted(map(str, unknown)))}"
+    return None
+
+
+def _result_dict(name: Optional[str], result: Tuple[bool, str, Optional[str]]) -> Dict:
+    """Convert a create_project result tuple to the convenience-API dictionary."""
+    success, message, project_path = result
+    return {
+        "success": success,
+        "message": message,
+        "project_path": project_path,
+        "project_name": name
+    }
 
 
 def create_new_project(name: str, title: Optional[str] = None,
@@ -201,16 +432,9 @@ def create_new_project(name: str, title: Optional[str] = None,
         Dictionary with success status, message, and project path
     """
     enhancement = NewProjectEnhancement()
-    success, message, project_path = enhancement.create_project(
+    return _result_dict(name, enhancement.create_project(
         name, title, description, instructions, color
-    )
-    
-    return {
-        "success": success,
-        "message": message,
-        "project_path": project_path,
-        "project_name": name
-    }
+    ))
 
 
 if __name__ == "__main__":
@@ -221,4 +445,4 @@ if __name__ == "__main__":
         description="This is a test project",
         instructions="Test instructions for the project"
     )
-    print(json.dumps(result, indent=2))
+    print(_dumps(result).decode("utf-8"))
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import gc
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pytest
+
+ENHANCEMENTS_DIR = Path(__file__).resolve().parents[1] / "enhancements"
+if str(ENHANCEMENTS_DIR) not in sys.path:
+    sys.path.insert(0, str(ENHANCEMENTS_DIR))
+
+import audit_logger
+from audit_logger import AuditLogger
+
+
+def _lines(path: Path) -> list[bytes]:
+    return [line for line in path.read_bytes().splitlines() if line.strip()]
+
+
+def test_entries_are_written_in_one_batch_on_flush(tmp_path: Path, monkeypatch) -> None:
+    writes = []
+    write_all = audit_logger._LogWriter._write_all
+    monkeypatch.setattr(audit_logger._LogWriter, "_write_all",
+                        lambda self, data: (writes.append(data), write_all(self, data)))
+    log = tmp_path / "audit.log"
+    logger = AuditLogger(str(log), flush_interval=60)
+    try:
+        for i in range(5):
+            logger.log_command(f"cmd{i}")
+        time.sleep(0.1)
+        assert not log.exists()
+
+        logger.flush()
+        assert len(writes) == 1
+        assert writes[0].count(b"\n") == 5
+        assert [e["command"] for e in logger.get_recent_logs(10)] == [f"cmd{i}" for i in range(5)]
+    finally:
+        logger.close()
+
+
+def test_full_batch_is_written_without_flush(tmp_path: Path) -> None:
+    log = tmp_path / "audit.log"
+    logger = AuditLogger(str(log), flush_interval=60, max_batch=3)
+    try:
+        for i in range(3):
+            logger.log_command(f"cmd{i}")
+        deadline = time.monotonic() + 5
+        while not (log.exists() and len(_lines(log)) == 3):
+            assert time.monotonic() < deadline, "full batch was not written"
+            time.sleep(0.01)
+    finally:
+        logger.close()
+
+
+@pytest.mark.parametrize("framed", [False, True])
+def test_recent_logs_round_trip(tmp_path: Path, framed: bool) -> None:
+    log = tmp_path / "audit.log"
+    logger = AuditLogger(str(log), framed=framed)
+    for i in range(50):
+        logger.log_command(f"cmd{i}", metadata={"i": i, "text": "line\nbreak"})
+    logger.log_security_event("login", {"ip": "127.0.0.1"})
+    logger.close()
+
+    assert log.read_bytes().startswith(audit_logger._FRAMED_MAGIC) is framed
+
+    reader = AuditLogger(str(log))
+    try:
+        recent = reader.get_recent_logs(3)
+        assert [e.get("command") for e in recent] == ["cmd48", "cmd49", None]
+        assert recent[0]["metadata"] == {"i": 48, "text": "line\nbreak"}
+        assert recent[-1]["event_type"] == "login"
+        assert recent[-1]["timestamp"].endswith("Z")
+        assert len(reader.get_recent_logs(1000)) == 51
+    finally:
+        reader.close()
+
+
+def test_existing_file_keeps_its_format(tmp_path: Path) -> None:
+    log = tmp_path / "audit.log"
+    plain = AuditLogger(str(log))
+    plain.log_command("first")
+    plain.close()
+
+    framed = AuditLogger(str(log), framed=True)
+    framed.log_command("second")
+    framed.close()
+
+    assert [line.startswith(b"{") for line in _lines(log)] == [True, True]
+    reader = AuditLogger(str(log))
+    assert [e["command"] for e in reader.get_recent_logs(10)] == ["first", "second"]
+    reader.close()
+
+
+def test_close_writes_pending_entries_and_drops_later_ones(tmp_path: Path) -> None:
+    log = tmp_path / "audit.log"
+    logger = AuditLogger(str(log), flush_interval=60)
+    logger.log_command("pending")
+    logger.close()
+    assert len(_lines(log)) == 1
+
+    logger.log_command("dropped")
+    logger.flush()
+    logger.close()
+    assert len(_lines(log)) == 1
+
+
+def test_flush_returns_while_other_threads_keep_logging(tmp_path: Path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.log"), flush_interval=0.05)
+    stop = threading.Event()
+
+    def produce() -> None:
+        while not stop.is_set():
+            logger.log_command("busy")
+
+    producers = [threading.Thread(target=produce) for _ in range(2)]
+    for producer in producers:
+        producer.start()
+    try:
+        time.sleep(0.1)
+        reader = threading.Thread(target=logger.get_recent_logs, args=(5,))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive(), "flush waited for the queue to drain"
+    finally:
+        stop.set()
+        for producer in producers:
+            producer.join()
+        logger.close()
+
+
+def test_unclosed_loggers_are_collected_with_their_threads(tmp_path: Path) -> None:
+    gc.collect()
+    threads_before = threading.active_count()
+    loggers = [AuditLogger(str(tmp_path / f"audit{i}.log"), flush_interval=60) for i in range(20)]
+    for logger in loggers:
+        logger.log_command("unclosed")
+    refs = [weakref.ref(logger) for logger in loggers]
+
+    del loggers, logger
+    gc.collect()
+
+    assert all(ref() is None for ref in refs)
+    assert threading.active_count() == threads_before
+    # Collecting a logger still writes what it had queued
+    assert all(len(_lines(tmp_path / f"audit{i}.log")) == 1 for i in range(20))
+
+
+@pytest.mark.skipif(audit_logger.fcntl is None, reason="flock needs fcntl")
+@pytest.mark.parametrize("framed", [False, True])
+def test_concurrent_processes_keep_batches_whole(tmp_path: Path, framed: bool) -> None:
+    log = tmp_path / "audit.log"
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(ENHANCEMENTS_DIR)!r})
+        from audit_logger import AuditLogger
+        logger = AuditLogger({str(log)!r}, framed={framed}, max_batch=64)
+        for i in range(500):
+            logger.log_command(f"{{sys.argv[1]}}-{{i}}", metadata={{"pad": "x" * 300}})
+        logger.close()
+    """)
+    writers = [subprocess.Popen([sys.executable, "-c", script, str(n)]) for n in range(4)]
+    assert [writer.wait(timeout=60) for writer in writers] == [0] * 4
+
+    reader = AuditLogger(str(log))
+    try:
+        entries = reader.get_recent_logs(5000)
+    finally:
+        reader.close()
+    commands = [e["command"] for e in entries]
+    assert len(commands) == 2000
+    assert set(commands) == {f"{n}-{i}" for n in range(4) for i in range(500)}
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+PLANNING_DIR = Path(__file__).resolve().parents[1] / "enhancements" / "instruments" / "planning"
+if str(PLANNING_DIR) not in sys.path:
+    sys.path.insert(0, str(PLANNING_DIR))
+
+from execute_implementation_plan import PlanExecutor, PlanParser, ShellWorker, TaskStatus, _format_ts
+
+
+def _write_plan(tmp_path: Path, groups: str) -> Path:
+    plan = tmp_path / "plan.md"
+    plan.write_text(
+        "# Plan\n\n**Status:** PENDING\n\n"
+        "## Specification\n**Goal:** test\n\n"
+        "## Tasks\n" + groups,
+        encoding="utf-8",
+    )
+    return plan
+
+
+def _task(num: int, name: str, log: Path, mark: str) -> str:
+    return (
+        f"### Task {num}: {name}\n"
+        f"**Steps:**\n"
+        f"1. [ ] python -c \"open(r'{log}', 'a').write('{mark}')\"\n"
+    )
+
+
+def _execute(plan: Path) -> PlanExecutor:
+    executor = PlanExecutor(plan, verbose=False)
+    executor.result = asyncio.run(executor.execute())
+    return executor
+
+
+def test_repeated_group_heading_continues_group(tmp_path: Path) -> None:
+    log = tmp_path / "order.log"
+    plan = _write_plan(tmp_path, (
+        "## Backend\n" + _task(1, "first", log, "1")
+        + "## Frontend\n**Depends:** Backend\n" + _task(1, "ui", log, "u")
+        + "## Backend\n" + _task(1, "second", log, "2")
+    ))
+
+    parser = PlanParser(plan)
+    parser.parse()
+    backend = [g for g in parser.task_groups if g.name == "Backend"]
+    assert len(backend) == 1
+    assert [t.name for t in backend[0].tasks] == ["first", "second"]
+
+    executor = _execute(plan)
+    assert executor.result is True
+    groups = {g.name: g for g in executor.parser.task_groups}
+    assert all(t.status is TaskStatus.COMPLETED for t in groups["Backend"].tasks)
+    assert log.read_text() == "12u"
+    assert "**Status:** COMPLETED" in plan.read_text()
+
+
+def test_repeated_heading_depending_on_itself_fails(tmp_path: Path) -> None:
+    log = tmp_path / "order.log"
+    plan = _write_plan(tmp_path, (
+        "## Backend\n" + _task(1, "first", log, "1")
+        + "## Backend\n**Depends:** Backend\n" + _task(1, "second", log, "2")
+    ))
+
+    executor = _execute(plan)
+    assert executor.result is False
+    assert not log.exists()
+    assert any("depends on itself" in e["message"] for e in executor.execution_log)
+
+
+def test_groups_run_after_their_dependencies(tmp_path: Path) -> None:
+    log = tmp_path / "order.log"
+    plan = _write_plan(tmp_path, (
+        "## C\n**Depends:** A, B\n" + _task(1, "c", log, "C")
+        + "## A\n" + _task(1, "a", log, "A")
+        + "## B\n**Depends:** A\n" + _task(1, "b", log, "B")
+    ))
+
+    executor = _execute(plan)
+    assert executor.result is True
+    assert log.read_text() == "ABC"
+
+
+def test_dependency_cycle_is_reported_before_running(tmp_path: Path) -> None:
+    log = tmp_path / "order.log"
+    plan = _write_plan(tmp_path, (
+        "## A\n**Depends:** B\n" + _task(1, "a", log, "A")
+        + "## B\n**Depends:** A\n" + _task(1, "b", log, "B")
+        + "## C\n" + _task(1, "c", log, "C")
+    ))
+
+    executor = _execute(plan)
+    assert executor.result is False
+    assert not log.exists()
+    messages = [e["message"] for e in executor.execution_log]
+    assert any(m in ("Cycle: A -> B -> A", "Cycle: B -> A -> B") for m in messages)
+    assert "**Status:** FAILED" in plan.read_text()
+
+
+def test_unknown_dependency_fails(tmp_path: Path) -> None:
+    log = tmp_path / "order.log"
+    plan = _write_plan(tmp_path, "## A\n**Depends:** Missing\n" + _task(1, "a", log, "A"))
+
+    executor = _execute(plan)
+    assert executor.result is False
+    assert any("unknown group: Missing" in e["message"] for e in executor.execution_log)
+
+
+def test_detect_cycle_finds_self_loop_and_ignores_dag(tmp_path: Path) -> None:
+    executor = PlanExecutor(tmp_path / "unused.md", verbose=False)
+
+    executor.successors = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []}
+    assert executor._detect_cycle() is None
+
+    executor.successors = {"a": ["a"]}
+    assert executor._detect_cycle() == ["a", "a"]
+
+    executor.successors = {"a": ["b"], "b": ["c"], "c": ["b"]}
+    assert executor._detect_cycle() == ["b", "c", "b"]
+
+
+def test_shell_worker_keeps_syntax_errors_inside_the_command() -> None:
+    async def run() -> list:
+        worker = ShellWorker()
+        try:
+            return [
+                await worker.run("python -c 'print(1)", timeout=3),
+                await worker.run("echo ok", timeout=3),
+            ]
+        finally:
+            await worker.close()
+
+    (rc, _, err), second = asyncio.run(run())
+    assert rc == 2
+    assert "unexpected EOF" in err
+    assert second == (0, "ok\n", "")
+
+def test_execution_log_entries_store_raw_timestamp(tmp_path: Path) -> None:
+    executor = PlanExecutor(tmp_path / "unused.md", verbose=False)
+    executor._log("info", "hello")
+
+    entry = executor.execution_log[0]
+    assert type(entry) is dict
+    assert set(entry) == {"ts_ns", "level", "message"}
+    assert isinstance(entry["ts_ns"], int)
+    assert len(_format_ts(entry["ts_ns"])) == len("2000-01-01 00:00:00")
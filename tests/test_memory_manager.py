@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+MEMORY_DIR = Path(__file__).resolve().parents[1] / "enhancements" / "mcp_memory_integration"
+if str(MEMORY_DIR) not in sys.path:
+    sys.path.insert(0, str(MEMORY_DIR))
+
+import memory_manager
+from memory_manager import MemoryServerClient
+
+# Minimal stdio MCP server. Each tools/call is answered from its own thread,
+# so a slow call is answered after calls sent behind it, and a notification
+# precedes every response.
+STUB_SERVER = textwrap.dedent("""
+    import json, os, sys, threading, time
+
+    write_lock = threading.Lock()
+
+    def send(message):
+        with write_lock:
+            sys.stdout.write(json.dumps({"jsonrpc": "2.0", "method": "notifications/message", "params": {}}) + "\\n")
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def call(request_id, name, args):
+        if name == "slow":
+            time.sleep(args["seconds"])
+        elif name == "die":
+            os._exit(0)
+        text = json.dumps({"tool": name, "args": args, "pid": os.getpid()})
+        send({"jsonrpc": "2.0", "id": request_id, "result": {"content": [{"type": "text", "text": text}]}})
+
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "initialize":
+            time.sleep(float(os.environ.get("INIT_DELAY", "0")))
+            send({"jsonrpc": "2.0", "id": message["id"], "result": {
+                "protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                "serverInfo": {"name": "stub", "version": "0"}}})
+        elif message["method"] == "tools/call":
+            params = message["params"]
+            threading.Thread(target=call, args=(message["id"], params["name"], params["arguments"])).start()
+""")
+
+
+@pytest.fixture
+def server_config(tmp_path: Path) -> dict:
+    server = tmp_path / "stub_server.py"
+    server.write_text(STUB_SERVER, encoding="utf-8")
+    return {"command": sys.executable, "args": [str(server)], "env": {}}
+
+
+@pytest.fixture
+def shared_client(tmp_path: Path, server_config: dict, monkeypatch):
+    """Point the module at the stub server and reset its shared client."""
+    config = tmp_path / "mcp.json"
+
+    def configure(**env: str) -> None:
+        config.write_text(json.dumps({"mcpServers": {"memory": {**server_config, "env": env}}}))
+
+    configure()
+    monkeypatch.setattr(memory_manager, "MCP_CONFIG_PATH", str(config))
+    monkeypatch.setattr(memory_manager, "_client", None)
+    monkeypatch.setattr(memory_manager, "_client_unavailable", False)
+    monkeypatch.setattr(memory_manager, "_client_starting", False)
+    yield configure
+    if memory_manager._client is not None:
+        memory_manager._client.close()
+
+
+def test_concurrent_calls_get_their_own_responses(server_config: dict) -> None:
+    client = MemoryServerClient(server_config)
+    try:
+        results = {}
+
+        def run(n: int) -> None:
+            results[n] = client.call("slow", {"seconds": 0.02 * (5 - n), "n": n})
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert {n: r["args"]["n"] for n, r in results.items()} == {n: n for n in range(5)}
+    finally:
+        client.close()
+
+
+def test_call_batch_returns_results_in_call_order(server_config: dict) -> None:
+    client = MemoryServerClient(server_config)
+    try:
+        results = client.call_batch([
+            ("slow", {"seconds": 0.2, "tag": "first"}),
+            ("echo", {"tag": "second"}),
+            ("echo", {"tag": "third"}),
+        ])
+        assert [r["args"]["tag"] for r in results] == ["first", "second", "third"]
+        assert [r["tool"] for r in results] == ["slow", "echo", "echo"]
+    finally:
+        client.close()
+
+
+def test_late_response_after_timeout_is_dropped(server_config: dict, monkeypatch) -> None:
+    client = MemoryServerClient(server_config)
+    try:
+        monkeypatch.setattr(memory_manager, "MCP_TIMEOUT", 0.1)
+        assert client.call("slow", {"seconds": 0.4}) == {"error": "MCP server timeout"}
+
+        time.sleep(0.6)
+        monkeypatch.setattr(memory_manager, "MCP_TIMEOUT", 5)
+        assert client.call("echo", {"tag": "next"})["args"] == {"tag": "next"}
+        assert client._responses == {}
+        assert client._abandoned == set()
+    finally:
+        client.close()
+
+
+def test_server_exit_is_reported_and_next_call_restarts_it(shared_client) -> None:
+    first = memory_manager._call_mcpl_memory("echo", {})
+    client = memory_manager._client
+
+    assert memory_manager._call_mcpl_memory("die", {}) == {"error": "MCP server exited"}
+    client.proc.wait(timeout=5)
+    assert not client.alive
+
+    second = memory_manager._call_mcpl_memory("echo", {"tag": "again"})
+    assert second["args"] == {"tag": "again"}
+    assert second["pid"] != first["pid"]
+    assert memory_manager._client is not client
+
+
+def test_calls_fall_back_to_mcpl_while_server_starts(shared_client, monkeypatch) -> None:
+    shared_client(INIT_DELAY="0.5")
+    mcpl_calls = []
+
+    def fake_run(cmd, **kwargs):
+        mcpl_calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps({"via": "mcpl"}), stderr="")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    results = {}
+    starter = threading.Thread(
+        target=lambda: results.setdefault("server", memory_manager._call_mcpl_memory("echo", {})))
+    starter.start()
+    deadline = time.monotonic() + 5
+    while not memory_manager._client_starting:
+        assert time.monotonic() < deadline, "server start never began"
+        time.sleep(0.01)
+
+    assert memory_manager._call_mcpl_memory("echo", {}) == {"via": "mcpl"}
+    starter.join()
+
+    assert results["server"]["tool"] == "echo"
+    assert [cmd[:4] for cmd in mcpl_calls] == [["mcpl", "call", "memory", "echo"]]
+    # Once started, calls use the server again
+    assert memory_manager._call_mcpl_memory("echo", {})["tool"] == "echo"
+    assert len(mcpl_calls) == 1
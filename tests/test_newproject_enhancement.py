@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ENHANCEMENTS_DIR = Path(__file__).resolve().parents[1] / "enhancements"
+if str(ENHANCEMENTS_DIR) not in sys.path:
+    sys.path.insert(0, str(ENHANCEMENTS_DIR))
+
+from newproject_enhancement import NewProjectEnhancement
+
+
+def test_create_project_writes_structure_and_metadata(tmp_path: Path) -> None:
+    enhancement = NewProjectEnhancement(base_dir=str(tmp_path / "projects"))
+
+    success, message, project_path = enhancement.create_project("My Proj!", color="#fff")
+
+    assert success, message
+    root = Path(project_path)
+    assert root == tmp_path / "projects" / "my_proj"
+    for sub in (".a0proj/instructions", "knowledge/main", "knowledge/longterm", "knowledge/volatile"):
+        assert (root / sub).is_dir()
+    metadata = json.loads((root / ".a0proj" / "project.json").read_bytes())
+    assert metadata["title"] == "My Proj!"
+    assert metadata["color"] == "#fff"
+    assert metadata["memory"] == "own"
+
+
+def test_create_projects_reports_duplicates_and_bad_specs(tmp_path: Path) -> None:
+    enhancement = NewProjectEnhancement(base_dir=str(tmp_path))
+
+    results = enhancement.create_projects([
+        {"name": "alpha"},
+        {"title": "no name"},
+        {"name": "alpha", "title": "again"},
+        {"name": "beta", "colour": "#000"},
+        {"name": "gamma", "description": "third"},
+    ])
+
+    assert [r["project_name"] for r in results] == ["alpha", None, "alpha", "beta", "gamma"]
+    assert [r["success"] for r in results[1:2] + results[3:]] == [False, False, True]
+    # The two "alpha" specs run concurrently; exactly one gets the directory
+    first, second = sorted((results[0], results[2]), key=lambda r: r["success"])
+    assert (first["success"], second["success"]) == (False, True)
+    assert "already exists" in first["message"]
+    assert "'name' is required" in results[1]["message"]
+    assert "colour" in results[3]["message"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["alpha", "gamma"]